@@ -1,28 +1,43 @@
 # Python >3.10
 
-from pycoordsplain.points import Point, PointsDraw
-from pycoordsplain.triangles import Triangle, TrianglesDraw
+from typing import Iterator
+
+from pycoordsplain.cache import ResultCache, decode_min_max, encode_min_max
+from pycoordsplain.jobs import SearchJob
+from pycoordsplain.drawing import PointsDraw, TrianglesDraw
+from pycoordsplain.triangles import IncrementalMinMax, TriangleBatch
+from pycoordsplain.search import DEFAULT_CHUNK_SIZE, SWEEP_MIN_POINTS, MinMaxResult, min_max_triangle
+from pycoordsplain.pointfile import UniqueFilter, is_binary_point_file, iter_point_chunks, open_binary_points
 
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 from matplotlib.pyplot import text
 from matplotlib.widgets import Button, TextBox
 
-import threading
-from itertools import permutations
-import uuid
-import re
+
+# Progress is polled rather than pushed, so updates cost nothing between ticks.
+PROGRESS_POLL_INTERVAL: int = 200
+SEARCH_CHUNK_SIZE: int = DEFAULT_CHUNK_SIZE
 
 
 def read_pointlist_from_file(file_path: str) -> str | None:
     try:
-        with open(file_path) as pointlist:
-            points.list = []
-            for point_coordinates in re.findall(r"\[\d{1,}, \d{1,}]", pointlist.read()):
-                point_coordinates_list = point_coordinates.strip("[]").split(",")
-                points.add_point_with_coordinates(
-                    int(point_coordinates_list[0]), int(point_coordinates_list[1])
-                )
+        # Points are fed to the store a chunk at a time and duplicate
+        # coordinates are dropped as they stream in, so loading holds one
+        # chunk and the filter's table beyond the store itself.
+        seen = UniqueFilter()
+        if is_binary_point_file(file_path):
+            points.clear()
+            for numbers, coords in open_binary_points(file_path).iter_chunks():
+                keep = seen.keep(coords)
+                points.add_points(numbers[keep], coords[keep])
+            points.update_draw()
+            return
+
+        with open(file_path, "rb") as pointlist:
+            points.clear()
+            for coords in iter_point_chunks(pointlist):
+                points.add_points_with_coordinates(coords[seen.keep(coords)])
             points.update_draw()
 
     except FileNotFoundError:
@@ -36,38 +51,6 @@ def read_pointlist_from_file(file_path: str) -> str | None:
         return "An unexpected error occurred"
 
 
-def triangles_area_map(points: list[Point]):
-    triangles_area_map: dict[Triangle, float] = {}
-
-    n: int = len(points)
-    predicted_triangles_count: int = n * (n - 1) * (n - 2)
-
-    progress_text.set_text("0%")
-    setted_progress: float = 0.0
-    for count, combo in enumerate(permutations(points, 3), 1):
-        current_triangle: Triangle = Triangle(f"temp-{uuid.uuid4()}", *combo)
-        area: float = current_triangle.area
-
-        progress: float = round(count / predicted_triangles_count * 100, 1)
-        if progress > setted_progress:
-            progress_text.set_text(f"{progress:.1f}%")
-            setted_progress = progress
-        if current_triangle.valid:
-            triangles_area_map[current_triangle] = area
-        else:
-            print(
-                f"not valid Triangle: {current_triangle.point1.number}, {current_triangle.point2.number}, {current_triangle.point3.number}"
-            )
-    progress_text.set_text("")
-    return triangles_area_map
-
-
-def min_max_triangle(
-    triangles_area: dict[Triangle, float]
-) -> tuple[Triangle, Triangle]:
-    return min(set(triangles_area), key=triangles_area.get), max(set(triangles_area), key=triangles_area.get)  # type: ignore
-
-
 def on_pointlistpath_submit(event) -> None:
     global pointlist_input_buffer
     exception = read_pointlist_from_file(event)
@@ -83,40 +66,94 @@ def on_pointlistpath_submit(event) -> None:
 
 
 def on_findbutton_clicked(event) -> None:
-    global min_triangle, max_triangle
-    with thread_creation_lock:
-        if threading.active_count() > 1:
+    global search_job, search_key
+    if search_job is not None:
+        search_job.cancel()
+        return
+
+    numbers, coords = points.store.numbers.copy(), points.store.coords.copy()
+    search_key = result_cache.key(coords, "min_max")
+    cached = decode_min_max(coords, result_cache.get(search_key))
+    with triangles.batch_edits():
+        triangles.clear()
+        if cached is not None:
+            show_result(numbers, coords, cached)
             return
 
-        process = threading.Thread(
-            target=calculating_triangles_process, args=(points.list,)
-        )
-        triangles.list = []
-        triangles.update_draw()
-        process.start()
-        while process.is_alive():
-            figure.canvas.draw()
-            plt.pause(0.1)
-        process.join(timeout=120)
-        if process.is_alive():
-            print("Process timeout, try again")
-        else:
-            triangles.add_triangle_with_points(
-                "min", min_triangle.point1, min_triangle.point2, min_triangle.point3  # type: ignore
-            )
-            triangles.add_triangle_with_points(
-                "max", max_triangle.point1, max_triangle.point2, max_triangle.point3  # type: ignore
-            )
-            print(f"min area: {min_triangle.area}, max area: {max_triangle.area}")  # type: ignore
-
-
-def calculating_triangles_process(points):
-    global min_triangle, max_triangle
-    try:
-        triangles_area: dict[Triangle, float] = triangles_area_map(points)
-        min_triangle, max_triangle = min_max_triangle(triangles_area)
-    except Exception as e:
-        print(f"Error in calculating_process: {e}")
+    search_job = SearchJob(find_triangles, numbers, coords).start()
+    find_button.label.set_text("Cancel")
+    progress_text.set_text("0%")
+    search_timer.start()
+
+
+def on_search_timer() -> None:
+    # Runs on the GUI thread, so all drawing happens here and the worker
+    # only updates the job's progress counter.
+    global search_job
+    if search_job is None:
+        search_timer.stop()
+        return
+    if not search_job.done():
+        progress_text.set_text(f"{search_job.progress * 100:.1f}%")
+        figure.canvas.draw_idle()
+        return
+
+    search_timer.stop()
+    job, search_job = search_job, None
+    find_button.label.set_text("Find min/max Triangles")
+    progress_text.set_text("")
+    if job.cancelled:
+        print("Search cancelled")
+    elif job.error is not None:
+        print(f"Error in calculating_process: {job.error}")
+    elif job.result is not None:
+        numbers, coords = job.args
+        show_result(numbers, coords, job.result)
+        # Caching is best effort; put reports and skips an unwritable cache.
+        result_cache.put(search_key, encode_min_max(coords, job.result))
+    figure.canvas.draw_idle()
+
+
+def show_result(numbers, coords, result: MinMaxResult) -> None:
+    if result.min_triple is None or result.max_triple is None:
+        print("Error in calculating_process: all points are collinear")
+        return
+
+    found = TriangleBatch(["min", "max"], [result.min_triple, result.max_triple], numbers, coords)
+    triangles.add_triangles(found)
+    min_triangle, max_triangle = found
+    print(f"min area: {min_triangle.area}, max area: {max_triangle.area}")
+    figure.canvas.draw_idle()
+
+
+def find_triangles(numbers, coords, progress) -> MinMaxResult:
+    if len(coords) >= SWEEP_MIN_POINTS:
+        incremental.clear()
+        return min_max_triangle(coords, SEARCH_CHUNK_SIZE, progress=progress)
+
+    # Small sets keep per-point candidates between clicks, so a reloaded
+    # file that changed by a few points is nearly free. Points are matched
+    # by position: numbers shift whenever a point is inserted mid-file.
+    incremental.sync_coords(coords, progress=progress)
+    rows: dict[tuple[float, float], list[int]] = {}
+    for row, point in enumerate(map(tuple, (coords + 0.0).tolist())):
+        rows.setdefault(point, []).append(row)
+
+    def triple(found: tuple[int, int, int] | None) -> tuple[int, int, int] | None:
+        if found is None:
+            return None
+        # Repeated coordinates map to distinct rows of the same point.
+        taken: dict[tuple[float, float], Iterator[int]] = {}
+        points = (incremental.store.get(number) for number in found)
+        keys = ((point.x + 0.0, point.y + 0.0) for point in points)
+        return tuple(sorted(next(taken.setdefault(key, iter(rows[key]))) for key in keys))  # type: ignore
+
+    return MinMaxResult(
+        triple(incremental.min_numbers),
+        incremental.min_area,
+        triple(incremental.max_numbers),
+        incremental.max_area,
+    )
 
 
 # print(plt.style.available)
@@ -160,7 +197,11 @@ else:
 
 points.adjust_axis_limits()
 
-min_triangle, max_triangle = None, None
-thread_creation_lock = threading.Lock()
+incremental = IncrementalMinMax()
+search_job: SearchJob | None = None
+search_key: str = ""
+result_cache = ResultCache()
+search_timer = figure.canvas.new_timer(interval=PROGRESS_POLL_INTERVAL)
+search_timer.add_callback(on_search_timer)
 
 plt.show()
@@ -0,0 +1,150 @@
+# Hot-path benchmarks, run with pytest-benchmark (requirements-bench.txt):
+#
+#   python -m pytest benchmarks.py --benchmark-autosave
+#       times every case and stores the run as JSON under .benchmarks/
+#   python -m pytest benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:20%
+#       compares against the latest stored run and fails on regressions
+#
+# --benchmark-json=PATH writes a run to a file of your choice instead.
+# Every point set is seeded by its size, so runs are comparable.
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+
+from pycoordsplain.pointfile import open_binary_points, read_points, write_binary_points
+from pycoordsplain.drawing import PointsDraw, TrianglesDraw
+from pycoordsplain.geometry import Point
+from pycoordsplain.search import min_max_triangle
+from pycoordsplain.triangles import Triangle, TriangleBatch
+
+
+SIZES = (10, 100, 1_000, 10_000)
+# The exact search is superlinear: 10^4 points take minutes per round.
+SEARCH_SIZES = (10, 100, 1_000)
+QUERIES = 1_000
+# A fresh interpreter per round, so the timings include module loading.
+IMPORTS = ("pycoordsplain.geometry", "pycoordsplain.triangles", "pycoordsplain.cli", "pycoordsplain.drawing")
+COORDINATE_RANGE = 1_000
+# Random triangles span a third of the plot on average, so at this size
+# every point lies inside thousands of them.
+OVERLAPPING_SIZE = 50_000
+
+
+def random_coords(count: int) -> np.ndarray:
+    return np.random.default_rng(count).integers(0, COORDINATE_RANGE, size=(count, 2))
+
+
+def random_triangles(count: int) -> list[Triangle]:
+    coords = random_coords(3 * count).tolist()
+    points = [Point(number, x, y) for number, (x, y) in enumerate(coords)]
+    return [Triangle(str(id), *points[3 * id : 3 * id + 3]) for id in range(count)]
+
+
+def random_queries() -> np.ndarray:
+    return np.random.default_rng(QUERIES).random((QUERIES, 2)) * COORDINATE_RANGE
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_triangle_area(benchmark, count):
+    triangles = random_triangles(count)
+    benchmark(lambda: [triangle.area for triangle in triangles])
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_check_validity(benchmark, count):
+    triangles = random_triangles(count)
+    benchmark(lambda: [triangle.check_validity() for triangle in triangles])
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_triangle_batch(benchmark, count):
+    indices = np.random.default_rng(count).integers(0, count, size=(count, 3))
+    ids = [str(id) for id in range(count)]
+    benchmark(TriangleBatch, ids, indices, np.arange(count), random_coords(count))
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_on_point(benchmark, count):
+    points = PointsDraw(Figure().add_subplot(), "k", scale=6)
+    points.store.extend(np.arange(1, count + 1), random_coords(count))
+    points.update_index()
+    queries = random_queries()
+    benchmark(lambda: [points.on_point(x, y) for x, y in queries])
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_on_triangle(benchmark, count):
+    triangles = TrianglesDraw(Figure().add_subplot(), "k")
+    triangles.add_triangles(random_triangles(count))
+    queries = random_queries()
+    # The first query builds the spatial index; only lookups are timed.
+    triangles.on_triangle(*queries[0])
+    benchmark(lambda: [triangles.on_triangle(x, y) for x, y in queries])
+
+
+def test_on_triangle_overlapping(benchmark):
+    triangles = TrianglesDraw(Figure().add_subplot(), "k")
+    triangles.add_triangles(random_triangles(OVERLAPPING_SIZE))
+    queries = random_queries()[:100]
+    triangles.on_triangle(*queries[0])
+    benchmark(lambda: [triangles.on_triangle(x, y) for x, y in queries])
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_remove_triangle_by_id(benchmark, count):
+    ids = [str(id) for id in range(0, count, max(count // 100, 1))]
+
+    def setup():
+        triangles = TrianglesDraw(Figure().add_subplot(), "k")
+        triangles.add_triangles(random_triangles(count))
+        return (triangles,), {}
+
+    def remove(triangles):
+        for id in ids:
+            triangles.remove_triangle_by_id(id)
+
+    benchmark.pedantic(remove, setup=setup, rounds=5)
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_remove_triangles_by_id_pattern(benchmark, count):
+    # Ids are decimal numbers, so "9" matches about a ninth of them,
+    # scattered over the slots.
+    def setup():
+        triangles = TrianglesDraw(Figure().add_subplot(), "k")
+        triangles.add_triangles(random_triangles(count))
+        return (triangles,), {}
+
+    benchmark.pedantic(lambda triangles: triangles.remove_triangles_by_id_pattern("9"), setup=setup, rounds=5)
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_read_text_points(benchmark, tmp_path, count):
+    path = os.path.join(tmp_path, "plist.txt")
+    with open(path, "w") as pointlist:
+        pointlist.write("".join("[%d, %d]" % (x, y) for x, y in random_coords(count).tolist()))
+    benchmark(read_points, path)
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_read_binary_points(benchmark, tmp_path, count):
+    path = os.path.join(tmp_path, "plist.bin")
+    write_binary_points(path, random_coords(count))
+    benchmark(lambda: np.asarray(open_binary_points(path).coords).sum())
+
+
+@pytest.mark.parametrize("count", SEARCH_SIZES)
+def test_min_max_triangle(benchmark, count):
+    coords = random_coords(count)
+    benchmark.pedantic(min_max_triangle, args=(coords,), rounds=3)
+
+
+@pytest.mark.parametrize("module", IMPORTS)
+def test_import_time(benchmark, module):
+    command = [sys.executable, "-c", f"import {module}"]
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    benchmark.pedantic(subprocess.run, args=(command,), kwargs={"check": True, "cwd": cwd}, rounds=5)
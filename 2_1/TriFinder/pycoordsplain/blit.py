@@ -0,0 +1,113 @@
+class BlitManager:
+    # Animated artists are left out of full canvas draws. The manager saves
+    # the rest of the figure on every draw_event and later repaints only
+    # the animated artists over that background. Only transient artists,
+    # such as hover annotations, belong here: figure content that is
+    # animated is missing from the saved background. Canvases that cannot
+    # blit keep their artists unanimated and fall back to draw_idle.
+    def __init__(self, canvas) -> None:
+        self.canvas = canvas
+        self.background = None
+        self.artists: list = []
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(getattr(self.canvas, "supports_blit", False))
+
+    def add_artist(self, artist) -> None:
+        if artist.figure is not self.canvas.figure:
+            raise ValueError("The artist does not belong to this canvas")
+        if self.enabled:
+            artist.set_animated(True)
+        self.artists.append(artist)
+
+    def on_draw(self, event) -> None:
+        # savefig draws through another canvas, or this one at print size,
+        # and includes animated artists itself; neither is the screen.
+        if event.canvas is not self.canvas or self.canvas.is_saving():
+            return
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_artists()
+
+    def draw_artists(self) -> None:
+        for artist in self.artists:
+            self.canvas.figure.draw_artist(artist)
+
+    def update(self) -> None:
+        if not self.enabled or self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
+
+
+def blit_manager(canvas) -> BlitManager:
+    # One manager per canvas: two managers would each restore their own
+    # background and wipe out the other's artists. It is kept on the canvas
+    # itself, so it goes away with the canvas.
+    manager = getattr(canvas, "_pycoordsplain_blit", None)
+    if manager is None:
+        manager = canvas._pycoordsplain_blit = BlitManager(canvas)
+    return manager
+
+
+class HoverController:
+    # The only motion handler on a canvas. Targets are asked in the order
+    # they were added and the first hit wins. The canvas is repainted only
+    # when the shown annotation actually changes, and then by blitting.
+    def __init__(self, canvas) -> None:
+        self.canvas = canvas
+        self.blit: BlitManager = blit_manager(canvas)
+        self.targets: list[tuple] = []
+        self.last: tuple | None = None
+        self.canvas.mpl_connect("motion_notify_event", self.on_hover)
+        self.canvas.mpl_connect("axes_leave_event", self.on_leave)
+
+    def add_target(self, axes, annotation, find, describe) -> None:
+        # find(x, y) returns the item under the cursor or None;
+        # describe(item) writes it into annotation.
+        self.blit.add_artist(annotation)
+        self.targets.append((axes, annotation, find, describe))
+
+    def on_hover(self, event) -> None:
+        if event.inaxes is None or event.xdata is None or event.ydata is None:
+            self.show(None)
+            return
+        for axes, annotation, find, describe in self.targets:
+            if axes is not event.inaxes:
+                continue
+            item = find(event.xdata, event.ydata)
+            if item is not None:
+                describe(item)
+                self.show(annotation)
+                return
+        self.show(None)
+
+    def on_leave(self, event) -> None:
+        self.show(None)
+
+    def show(self, annotation) -> None:
+        # The last hit is remembered as what it put on screen, so moving
+        # within one item, or between empty spots, draws nothing.
+        state = None if annotation is None else (annotation, annotation.get_text(), tuple(annotation.xy))
+        if state == self.last:
+            return
+        for _, other, _, _ in self.targets:
+            other.set_visible(other is annotation)
+        self.last = state
+        self.blit.update()
+
+    def reset(self) -> None:
+        # Hides the annotation, e.g. after the hovered data was replaced.
+        self.show(None)
+
+
+def hover_controller(canvas) -> HoverController:
+    # Kept on the canvas like its BlitManager, and for the same reason.
+    controller = getattr(canvas, "_pycoordsplain_hover", None)
+    if controller is None:
+        controller = canvas._pycoordsplain_hover = HoverController(canvas)
+    return controller
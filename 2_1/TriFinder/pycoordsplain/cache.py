@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from .kernels import Triple, as_coords
+from .search import MinMaxResult, TopKResult
+
+
+# Bump whenever a search can return a different result for the same points,
+# so entries written by older code are never served.
+ALGORITHM_VERSION: int = 1
+DEFAULT_MAX_BYTES: int = 32 << 20
+CACHE_SUFFIX: str = ".json"
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pycoordsplain")
+
+
+class ResultCache:
+    # One JSON file per entry; file modification times double as the LRU
+    # order, so hits touch their file and writes evict the oldest entries
+    # until the directory fits in max_bytes.
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory: str = directory or default_cache_dir()
+        self.max_bytes: int = max_bytes
+
+    def key(self, coords, kind: str, **params) -> str:
+        # Sorted, so the key names the point set rather than its order.
+        # Adding 0.0 folds -0.0 into 0.0.
+        coords = as_coords(coords) + 0.0
+        ordered = np.ascontiguousarray(coords[np.lexsort((coords[:, 1], coords[:, 0]))])
+        digest = hashlib.sha256()
+        digest.update(json.dumps([ALGORITHM_VERSION, kind, sorted(params.items())]).encode())
+        digest.update(ordered.astype("<f8").tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            with open(path) as entry:
+                value = json.load(entry)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def put(self, key: str, value: dict) -> bool:
+        # Best effort: a cache that cannot be written, e.g. a read-only
+        # cache directory, is reported and skipped, so the result that was
+        # just computed is never lost. Returns whether the entry was stored.
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Written under a temporary name and renamed, so readers never
+            # see a partial entry.
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "w") as entry:
+                    json.dump(value, entry)
+                os.replace(temporary, self._path(key))
+            except BaseException:
+                os.unlink(temporary)
+                raise
+        except OSError as e:
+            print(f"Warning: cannot write the result cache in {self.directory}: {e}", file=sys.stderr)
+            return False
+        self.evict()
+        return True
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        # (modification time, size, path), least recently used first.
+        found = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        for name in names:
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found.append((stat.st_mtime, stat.st_size, path))
+        return sorted(found)
+
+    def evict(self) -> None:
+        entries = self.entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            size -= entry_size
+
+    def clear(self) -> None:
+        for _, _, path in self.entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+# Entries hold vertex coordinates rather than indices: the key ignores the
+# point order, so indices are only meaningful once mapped back onto the
+# coordinates being searched.
+
+
+def _vertices(coords: np.ndarray, triple: Triple | None) -> list | None:
+    return None if triple is None else coords[list(triple)].tolist()
+
+
+def _locate(lookup: dict[tuple[float, float], int], vertices: list | None) -> Triple | None:
+    if vertices is None:
+        return None
+    return tuple(sorted(lookup[(float(x), float(y))] for x, y in vertices))  # type: ignore
+
+
+def _lookup(coords: np.ndarray) -> dict[tuple[float, float], int]:
+    lookup: dict[tuple[float, float], int] = {}
+    for index, (x, y) in enumerate(coords.tolist()):
+        lookup.setdefault((x + 0.0, y + 0.0), index)
+    return lookup
+
+
+def encode_min_max(coords, result: MinMaxResult) -> dict:
+    coords = as_coords(coords)
+    return {
+        "min": _vertices(coords, result.min_triple),
+        "min_area": result.min_area,
+        "max": _vertices(coords, result.max_triple),
+        "max_area": result.max_area,
+    }
+
+
+def decode_min_max(coords, value: dict | None) -> MinMaxResult | None:
+    if value is None:
+        return None
+    lookup = _lookup(as_coords(coords))
+    try:
+        return MinMaxResult(
+            _locate(lookup, value["min"]), value["min_area"], _locate(lookup, value["max"]), value["max_area"]
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def encode_top_k(coords, result: TopKResult) -> dict:
+    coords = as_coords(coords)
+    return {
+        "smallest": [[area, _vertices(coords, triple)] for area, triple in result.smallest],
+        "largest": [[area, _vertices(coords, triple)] for area, triple in result.largest],
+    }
+
+
+def decode_top_k(coords, value: dict | None) -> TopKResult | None:
+    if value is None:
+        return None
+    lookup = _lookup(as_coords(coords))
+    try:
+        return TopKResult(
+            [(area, _locate(lookup, vertices)) for area, vertices in value["smallest"]],  # type: ignore
+            [(area, _locate(lookup, vertices)) for area, vertices in value["largest"]],  # type: ignore
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
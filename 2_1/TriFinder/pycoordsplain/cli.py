@@ -0,0 +1,128 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from .cache import ResultCache, decode_min_max, decode_top_k, encode_min_max, encode_top_k
+from .pointfile import is_binary_point_file, open_binary_points, read_points
+from .preprocess import preprocess
+from .search import DEFAULT_CHUNK_SIZE, Triple, min_max_triangle, top_k_triangles
+
+
+def load_point_file(file_path: str) -> tuple[np.ndarray, np.ndarray]:
+    if is_binary_point_file(file_path):
+        columns = open_binary_points(file_path)
+        return np.asarray(columns.numbers), columns.coords
+    coords = read_points(file_path)
+    return np.arange(1, len(coords) + 1), coords
+
+
+def describe_triangle(
+    numbers: np.ndarray, coords: np.ndarray, triple: Triple | None, area: float
+) -> dict | None:
+    if triple is None:
+        return None
+    return {
+        "points": [int(numbers[index]) for index in triple],
+        "coordinates": [coords[index].tolist() for index in triple],
+        "area": area,
+    }
+
+
+def search_file(
+    file_path: str,
+    processes: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    top: int = 0,
+    cache: ResultCache | None = None,
+    collinear: bool = False,
+) -> dict:
+    started = time.perf_counter()
+    numbers, coords = load_point_file(file_path)
+    # Repeated coordinates only form degenerate triangles, so they are
+    # dropped before searching; the kept points retain their file numbers.
+    prepared = preprocess(coords, collinear)
+    numbers, coords = numbers[prepared.rows], prepared.coords
+    cached = True
+
+    result = None
+    if cache is not None:
+        min_max_key = cache.key(coords, "min_max")
+        result = decode_min_max(coords, cache.get(min_max_key))
+    if result is None:
+        cached = False
+        result = min_max_triangle(coords, chunk_size, processes=processes)
+        if cache is not None:
+            cache.put(min_max_key, encode_min_max(coords, result))
+    report = {
+        "file": file_path,
+        "points": len(coords),
+        "duplicates": prepared.stats.duplicates,
+        "min": describe_triangle(numbers, coords, result.min_triple, result.min_area),
+        "max": describe_triangle(numbers, coords, result.max_triple, result.max_area),
+    }
+
+    if top:
+        top_k = None
+        if cache is not None:
+            top_k_key = cache.key(coords, "top_k", k=top)
+            top_k = decode_top_k(coords, cache.get(top_k_key))
+        if top_k is None:
+            cached = False
+            top_k = top_k_triangles(coords, top, chunk_size)
+            if cache is not None:
+                cache.put(top_k_key, encode_top_k(coords, top_k))
+        report["smallest"] = [describe_triangle(numbers, coords, triple, area) for area, triple in top_k.smallest]
+        report["largest"] = [describe_triangle(numbers, coords, triple, area) for area, triple in top_k.largest]
+
+    if collinear:
+        report["collinear_triples"] = prepared.stats.collinear_triples
+        report["longest_line"] = prepared.stats.longest_line
+    report["cached"] = cached and cache is not None
+    report["seconds"] = round(time.perf_counter() - started, 6)
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m pycoordsplain",
+        description="Find the smallest and largest non-degenerate triangles in point files.",
+    )
+    parser.add_argument("files", nargs="+", help="text point lists or binary point files")
+    parser.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="worker processes for the triple scan")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="triples per vectorized block")
+    parser.add_argument("--top", type=int, default=0, metavar="K", help="also list the K smallest and K largest triangles")
+    parser.add_argument(
+        "--collinear-stats", action="store_true", help="also count collinear triples among the unique points"
+    )
+    parser.add_argument("--cache-dir", help="result cache directory (default: the user cache directory)")
+    parser.add_argument("--no-cache", action="store_true", help="neither read nor write cached results")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+
+    results = []
+    failed = False
+    for file_path in args.files:
+        try:
+            results.append(
+                search_file(file_path, args.processes, args.chunk_size, args.top, cache, args.collinear_stats)
+            )
+        except (OSError, ValueError) as e:
+            failed = True
+            print(f"Error: {file_path}: {e}", file=sys.stderr)
+            results.append({"file": file_path, "error": str(e)})
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as result_file:
+            result_file.write(output + "\n")
+    else:
+        print(output)
+    return 1 if failed else 0
@@ -0,0 +1,466 @@
+import re
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+
+from .points import GridIndex, Point, PointStore
+from .triangles import Triangle, TriangleBatch, TriangleIndex, segment_distances
+
+
+# The matplotlib layer. The classes import matplotlib when they are
+# instantiated, and points and triangles never import this module, so the
+# headless code paths stay free of matplotlib.
+
+
+class PointsDraw:
+    # Above this many points in view a binned density image stands in for
+    # the scatter, which matplotlib cannot pan or zoom at that size.
+    LOD_THRESHOLD: int = 50_000
+    DENSITY_BINS: int = 400
+
+    def __init__(
+        self,
+        axes,
+        color,
+        scale: int = 3,
+    ) -> None:
+        # Imported here so headless users of this module never load matplotlib.
+        from matplotlib.colors import LinearSegmentedColormap, to_rgba
+        from matplotlib.image import AxesImage
+
+        from .blit import hover_controller
+
+        self.pointCount = 1
+        self.axes = axes
+        self.scale: int = scale
+        self.store: PointStore = PointStore()
+        self.index: GridIndex = GridIndex(scale * 0.1)
+        self.indexed: int = 0
+        self.draw = self.axes.scatter([], [], s=scale, c=color)
+
+        # Empty bins are fully transparent, full ones take the point colour.
+        red, green, blue, _ = to_rgba(color)
+        colormap = LinearSegmentedColormap.from_list("density", [(red, green, blue, 0), (red, green, blue, 1)])
+        self.density = AxesImage(self.axes, cmap=colormap, origin="lower", interpolation="nearest")
+        self.density.set_visible(False)
+        self.axes.add_image(self.density)
+        self.rendered_view: tuple | None = None
+        self.axes.callbacks.connect("xlim_changed", self.on_limits_changed)
+        self.axes.callbacks.connect("ylim_changed", self.on_limits_changed)
+
+        self.annotation = self.axes.annotate(
+            "",
+            xy=(0, 0),
+            xytext=(10, -20),
+            textcoords="offset points",
+            bbox=dict(boxstyle="round", fc="w"),
+        )
+        self.annotation.set_visible(False)
+
+        self.hover = hover_controller(self.axes.figure.canvas)
+        self.hover.add_target(self.axes, self.annotation, self.on_point, self.update_annotation)
+
+    def add_point(self, point: Point) -> ValueError | None:
+        if point.number in self.store:
+            return ValueError(f"A point with {point.number} number already exists")
+        self.pointCount += 1
+        self.store.add(point.number, point.x, point.y)
+
+    def add_point_with_coordinates(self, x: float, y: float) -> None:
+        while self.pointCount in self.store:
+            self.pointCount += 1
+        self.store.add(self.pointCount, x, y)
+        self.pointCount += 1
+
+    def add_points(self, numbers, coords) -> None:
+        self.store.extend(numbers, coords)
+        if len(self.store):
+            self.pointCount = max(self.pointCount, int(self.store.numbers.max()) + 1)
+
+    def add_points_with_coordinates(self, coords) -> None:
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        numbers = np.arange(self.pointCount, self.pointCount + len(coords))
+        if len(self.store) and len(coords):
+            # Skip past numbers taken by explicitly numbered points.
+            numbers += max(0, int(self.store.numbers.max()) + 1 - self.pointCount)
+        self.store.extend(numbers, coords)
+        if len(coords):
+            self.pointCount = int(numbers[-1]) + 1
+
+    def clear(self) -> None:
+        self.store.clear()
+        self.index.clear()
+        self.indexed = 0
+        self.hover.reset()
+
+    def update_index(self) -> None:
+        # Store rows are append-only, so only rows added since the last
+        # query need to be hashed into the grid.
+        if self.indexed < len(self.store):
+            rows = np.arange(self.indexed, len(self.store))
+            self.index.insert_many(rows, self.store.coords[self.indexed :])
+            self.indexed = len(self.store)
+
+    def update_draw(self):
+        self.rendered_view = None
+        self.adjust_axis_limits()
+        self.render_view()
+        self.axes.figure.canvas.draw_idle()
+
+    def on_limits_changed(self, axes) -> None:
+        self.render_view()
+
+    def render_view(self) -> None:
+        # Only the points inside the current limits are handed to matplotlib,
+        # either as scatter offsets or, past LOD_THRESHOLD, as a density image
+        # binned over exactly the visible rectangle.
+        x_limits, y_limits = self.axes.get_xlim(), self.axes.get_ylim()
+        view = (x_limits, y_limits, len(self.store))
+        if view == self.rendered_view:
+            return
+        self.rendered_view = view
+
+        (x0, x1), (y0, y1) = sorted(x_limits), sorted(y_limits)
+        x, y = self.store.x, self.store.y
+        visible = self.store.coords[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)]
+        if len(visible) <= self.LOD_THRESHOLD or x0 == x1 or y0 == y1:
+            self.density.set_visible(False)
+            self.draw.set_offsets(visible)
+            return
+
+        image = self.bin_density(visible, (x0, x1, y0, y1))
+        self.draw.set_offsets(np.empty((0, 2)))
+        self.density.set_data(image)
+        self.density.set_extent((x0, x1, y0, y1))
+        self.density.set_clim(0, max(float(image.max()), 1.0))
+        self.density.set_visible(True)
+
+    def bin_density(self, coords: np.ndarray, extent: tuple[float, float, float, float]) -> np.ndarray:
+        # np.histogram2d on uniform bins, done with one bincount. Counts are
+        # log scaled so sparse regions stay visible next to dense ones.
+        x0, x1, y0, y1 = extent
+        bins = self.DENSITY_BINS
+        columns = ((coords[:, 0] - x0) * (bins / (x1 - x0))).astype(np.intp)
+        rows = ((coords[:, 1] - y0) * (bins / (y1 - y0))).astype(np.intp)
+        np.clip(columns, 0, bins - 1, out=columns)
+        np.clip(rows, 0, bins - 1, out=rows)
+        counts = np.bincount(rows * bins + columns, minlength=bins * bins).reshape(bins, bins)
+        return np.log1p(counts)
+
+    def adjust_axis_limits(self) -> None:
+        if not len(self.store):
+            return
+
+        x_min, y_min = self.store.coords.min(axis=0)
+        x_max, y_max = self.store.coords.max(axis=0)
+
+        buffer = 5
+        self.axes.set_xlim(x_min - buffer, x_max + buffer)
+        self.axes.set_ylim(y_min - buffer, y_max + buffer)
+
+    def on_point(self, x, y) -> Point | None:
+        if not len(self.store):
+            return
+
+        self.update_index()
+        row = self.index.nearest(self.store.coords, x, y, self.scale * 0.1)
+        return None if row is None else self.store[row]
+
+    def update_annotation(self, point):
+        x, y = point.x, point.y
+        self.annotation.xy = (x, y)
+        self.annotation.set_text(f"Point {point.number}: [{x:.0f}, {y:.0f}]")
+
+
+class TrianglesDraw:
+    def __init__(self, axes, color, points_scale: int = 3) -> None:
+        # Imported here so headless users of this module never load matplotlib.
+        from matplotlib.lines import Line2D
+
+        from .blit import hover_controller
+
+        self.triangleCount = 1
+        self.axes = axes
+        self.color = color
+        self.scale: int = points_scale
+        # Dense slots: ids[slot], numbers[slot] and vertices[slot] describe
+        # the same triangle, self.slots maps its id back to the slot, and
+        # removal moves the last slot into the hole.
+        self.ids: list[str] = []
+        self.slots: dict[str, int] = {}
+        self.numbers = np.empty((16, 3), dtype=np.int64)
+        self.vertices = np.empty((16, 3, 2), dtype=np.float64)
+        # outlines[slot] is the closed outline of the slot followed by its
+        # NaN separator; only changed slots are rewritten.
+        self.outlines = np.full((16, 5, 2), np.nan)
+
+        # The index is packed once and then patched: removed triangles are
+        # discarded from it, moved ones remapped through index_slots and
+        # slot_rows, and added ones scanned linearly until there are enough
+        # of them, or enough discarded, to repack.
+        self.index: TriangleIndex | None = None
+        self.index_slots = np.empty(0, dtype=np.intp)
+        self.slot_rows = np.empty(16, dtype=np.intp)
+        self.pending: set[int] = set()
+
+        # Every outline and its vertex markers form one NaN-separated line,
+        # so an update is a single array hand-off rather than a Path per
+        # triangle as in a PolyCollection.
+        self.edges = Line2D([], [], marker="o", markersize=points_scale, linestyle="-", color=color)
+        self.axes.add_line(self.edges)
+        self.annotation = self.axes.annotate(
+            "",
+            xy=(0, 0),
+            xytext=(10, -20),
+            textcoords="offset points",
+            bbox=dict(boxstyle="round", fc="w"),
+        )
+        self.annotation.set_visible(False)
+        # Id of the triangle the annotation describes.
+        self.shown: str | None = None
+        # Nesting depth of batch_edits and whether a redraw is owed.
+        self._deferred: int = 0
+        self._stale: bool = False
+
+        self.hover = hover_controller(self.axes.figure.canvas)
+        self.blit = self.hover.blit
+        self.hover.add_target(self.axes, self.annotation, self.on_triangle, self.update_annotation)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= len(self.vertices):
+            return
+        capacity = max(capacity, 2 * len(self.vertices))
+        size = len(self.ids)
+        for name in ("numbers", "vertices", "outlines", "slot_rows"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:size] = old[:size]
+            setattr(self, name, new)
+        self.outlines[:, 4] = np.nan
+
+    def _append(self, batch: "TriangleBatch", rows: np.ndarray) -> None:
+        # Appends the valid triangles among rows of batch, all or none.
+        rows = rows[batch.valid[rows]]
+        ids = [batch.ids[row] for row in rows.tolist()]
+        for id in ids:
+            if id in self.slots:
+                raise ValueError(f"A triangle with {id} id already exists")
+        if len(set(ids)) != len(ids):
+            raise ValueError("The triangles repeat an id")
+
+        size = len(self.ids)
+        self._reserve(size + len(ids))
+        self.numbers[size : size + len(ids)] = batch.numbers[batch.indices[rows]]
+        self.vertices[size : size + len(ids)] = np.asarray(batch.coords, dtype=np.float64)[batch.indices[rows]]
+        self.outlines[size : size + len(ids), :3] = self.vertices[size : size + len(ids)]
+        self.outlines[size : size + len(ids), 3] = self.vertices[size : size + len(ids), 0]
+        self.slot_rows[size : size + len(ids)] = -1
+        self.pending.update(range(size, size + len(ids)))
+        self.slots.update(zip(ids, range(size, size + len(ids))))
+        self.ids.extend(ids)
+
+    def add_triangle(self, triangle: Triangle) -> None:
+        if triangle.id in self.slots:
+            raise ValueError(f"A triangle with {triangle.id} id already exists")
+
+        if triangle.valid:
+            self._append(triangle.batch, np.array([triangle.row]))
+            self.update_draw()
+
+    def add_triangles(self, triangles) -> None:
+        # Batched add_triangle with a single redraw. A TriangleBatch is
+        # copied in with a few array operations.
+        try:
+            if not isinstance(triangles, TriangleBatch):
+                # Loose triangles are gathered into one batch first rather
+                # than each building a batch of its own.
+                triangles = [triangle for triangle in triangles if triangle.valid]
+                triangles = TriangleBatch.from_points(
+                    [triangle.id for triangle in triangles], [triangle.points for triangle in triangles]
+                )
+            self._append(triangles, np.arange(len(triangles)))
+        finally:
+            self.update_draw()
+
+    def add_triangle_with_points(
+        self, id: str, point1: Point, point2: Point, point3: Point
+    ) -> None:
+        self.add_triangle(Triangle(id, point1, point2, point3))
+
+    def triangle(self, slot: int) -> Triangle:
+        # A standalone copy, unaffected by later removals.
+        return TriangleBatch([self.ids[slot]], [(0, 1, 2)], self.numbers[slot].copy(), self.vertices[slot].copy())[0]
+
+    @property
+    def batch(self) -> "TriangleBatch":
+        # A copy of every drawn triangle, in slot order.
+        size = len(self.ids)
+        return TriangleBatch(
+            self.ids,
+            np.arange(3 * size).reshape(-1, 3),
+            self.numbers[:size].ravel().copy(),
+            self.vertices[:size].reshape(-1, 2).copy(),
+        )
+
+    def _unindex(self, slot: int, last: int) -> None:
+        # Drops slot from the index and moves the last slot into its place.
+        row = self.slot_rows[slot]
+        if row < 0:
+            self.pending.discard(slot)
+        else:
+            self.index.discard(row)  # type: ignore
+        if slot != last:
+            row = self.slot_rows[slot] = self.slot_rows[last]
+            if row < 0:
+                self.pending.discard(last)
+                self.pending.add(slot)
+            else:
+                self.index_slots[row] = slot
+
+    def _hide_removed(self) -> None:
+        # The annotation of a removed triangle must not outlive it, and the
+        # controller must not treat the next hover on its old spot as known.
+        if self.annotation.get_visible() and self.shown not in self.slots:
+            self.hover.reset()
+
+    def remove_triangle_by_id(self, id: str) -> None:
+        slot = self.slots.pop(id, None)
+        if slot is None:
+            return
+        last = len(self.ids) - 1
+        if self.index is not None:
+            self._unindex(slot, last)
+        if slot != last:
+            moved = self.ids[slot] = self.ids[last]
+            self.numbers[slot] = self.numbers[last]
+            self.vertices[slot] = self.vertices[last]
+            self.outlines[slot] = self.outlines[last]
+            self.slots[moved] = slot
+        self.ids.pop()
+        self._hide_removed()
+        self.update_draw()
+
+    def remove_triangles_by_id_pattern(self, id_pattern: str) -> None:
+        # Removes every triangle whose id matches at its start (re.match),
+        # compacting the surviving slots in one pass.
+        pattern = re.compile(id_pattern)
+        removed = np.fromiter((pattern.match(id) is not None for id in self.ids), dtype=bool, count=len(self.ids))
+        if not removed.any():
+            return
+        kept = np.flatnonzero(~removed)
+        self.numbers[: len(kept)] = self.numbers[kept]
+        self.vertices[: len(kept)] = self.vertices[kept]
+        self.outlines[: len(kept)] = self.outlines[kept]
+        self.ids = [self.ids[slot] for slot in kept.tolist()]
+        self.slots = {id: slot for slot, id in enumerate(self.ids)}
+        self.index = None
+        self._hide_removed()
+        self.update_draw()
+
+    def clear(self) -> None:
+        self.ids = []
+        self.slots = {}
+        self.index = None
+        self.hover.reset()
+        self.update_draw()
+
+    def on_triangle(self, x, y) -> Triangle | None:
+        if not self.ids:
+            return None
+
+        size = len(self.ids)
+        if (
+            self.index is None
+            or len(self.pending) > TriangleIndex.LEAF_SIZE
+            or 2 * self.index.discarded > len(self.index)
+        ):
+            self.index = TriangleIndex(self.vertices[:size])
+            self.index_slots = np.arange(size)
+            self.slot_rows[:size] = self.index_slots
+            self.pending.clear()
+
+        best: tuple[int, float] | None = None
+        nearest = self.index.nearest(x, y)
+        if nearest is not None:
+            best = (int(self.index_slots[nearest[0]]), nearest[1])
+        if self.pending:
+            slots = np.fromiter(self.pending, dtype=np.intp, count=len(self.pending))
+            triangles = self.vertices[slots]
+            distances = segment_distances(x, y, triangles, np.roll(triangles, -1, axis=1)).min(axis=1)
+            local = int(np.argmin(distances))
+            if best is None or distances[local] < best[1]:
+                best = (int(slots[local]), float(distances[local]))
+        return None if best is None else self.triangle(best[0])
+
+    @contextmanager
+    def batch_edits(self) -> Iterator["TrianglesDraw"]:
+        # Coalesces the redraws of every edit made inside into one, e.g.
+        # for a loop of remove_triangle_by_id calls.
+        self._deferred += 1
+        try:
+            yield self
+        finally:
+            self._deferred -= 1
+            if not self._deferred and self._stale:
+                self.update_draw()
+
+    def update_draw(self) -> None:
+        # Hands the live outlines, already closed and NaN-separated, to the
+        # line. The outlines are ordinary figure content, so exports include
+        # them and the hover blits repaint over a background that already
+        # has them. The price is O(N) per redraw: set_data copies every live
+        # outline and draw_idle renders the whole canvas, which is why
+        # batched edits redraw once.
+        if self._deferred:
+            self._stale = True
+            return
+        self._stale = False
+        outlines = self.outlines[: len(self.ids)].reshape(-1, 2)
+        self.edges.set_data(outlines[:, 0], outlines[:, 1])
+        self.axes.figure.canvas.draw_idle()
+
+    def update_annotation(self, triangle):
+        self.shown = triangle.id
+        triangle_points = triangle.points
+        self.annotation.xy = (
+            min(point.x for point in triangle_points),
+            min(point.y for point in triangle_points),
+        )
+        self.annotation.set_text(
+            f"Triangle {triangle.id} area: {triangle.area}\n"
+            + ", ".join(f"P{point.number}[{point.x:.0f}, {point.y:.0f}]" for point in triangle_points)
+        )
+
+    @staticmethod
+    def point_in_triangle(px, py, x1, y1, x2, y2, x3, y3) -> bool:
+        d1 = TrianglesDraw.sign(px, py, x1, y1, x2, y2)
+        d2 = TrianglesDraw.sign(px, py, x2, y2, x3, y3)
+        d3 = TrianglesDraw.sign(px, py, x3, y3, x1, y1)
+        has_neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
+        has_pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
+        return not (has_neg and has_pos)
+
+    @staticmethod
+    def sign(px, py, x1, y1, x2, y2) -> float:
+        return (px - x2) * (y1 - y2) - (x1 - x2) * (py - y2)
+
+    @staticmethod
+    def distance_to_triangle(px, py, x1, y1, x2, y2, x3, y3) -> float:
+        return min(
+            TrianglesDraw.point_to_line_distance(px, py, x1, y1, x2, y2),
+            TrianglesDraw.point_to_line_distance(px, py, x2, y2, x3, y3),
+            TrianglesDraw.point_to_line_distance(px, py, x3, y3, x1, y1),
+        )
+
+    @staticmethod
+    def point_to_line_distance(px, py, x1, y1, x2, y2) -> float:
+        num = np.abs((x2 - x1) * (y1 - py) - (x1 - px) * (y2 - y1))
+        den = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        if den == 0:
+            # Coincident endpoints: the line degenerates to a point.
+            return float(np.hypot(px - x1, py - y1))
+        return num / den
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from fractions import Fraction
+
+
+# Pure-Python geometry: importing this module loads neither numpy nor
+# matplotlib, so scripts that only need points and exact areas start fast.
+
+
+@dataclass(frozen=True, slots=True)
+class Point:
+    # Immutable and compared by value, so points can key dicts and sets.
+    number: int
+    x: float
+    y: float
+
+
+class PointPool:
+    # Interns points by position: the first point seen at (x, y) is handed
+    # out for every later point there, so duplicates share one object and
+    # keep the first number. -0.0 and 0.0 are the same position.
+    def __init__(self) -> None:
+        self._points: dict[tuple[float, float], Point] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, position: tuple[float, float]) -> bool:
+        return position in self._points
+
+    def intern(self, point: Point) -> Point:
+        return self._points.setdefault((point.x, point.y), point)
+
+    def get(self, x: float, y: float) -> Point | None:
+        return self._points.get((x, y))
+
+    def clear(self) -> None:
+        self._points.clear()
+
+
+def _exact(value) -> int | Fraction:
+    # Floats are binary fractions, so this conversion loses nothing.
+    if isinstance(value, int):
+        return value
+    value = float(value)
+    return int(value) if value.is_integer() else Fraction(value)
+
+
+def _doubled_area(x1, y1, x2, y2, x3, y3) -> int | Fraction:
+    x1, y1, x2, y2, x3, y3 = map(_exact, (x1, y1, x2, y2, x3, y3))
+    return (x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1)
+
+
+def doubled_signed_area(point1: Point, point2: Point, point3: Point) -> int | Fraction:
+    # Exact twice the signed area, positive for counter-clockwise order.
+    # Integral coordinates stay in Python ints, which cannot overflow.
+    return _doubled_area(point1.x, point1.y, point2.x, point2.y, point3.x, point3.y)
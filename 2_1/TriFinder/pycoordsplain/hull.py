@@ -0,0 +1,105 @@
+import numpy as np
+
+
+def _cross(o: list[float], a: list[float], b: list[float]) -> float:
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _interior_filter(coords: np.ndarray) -> np.ndarray:
+    # Akl-Toussaint: points strictly inside the octagon spanned by the extreme
+    # points in eight directions can never be hull vertices.
+    x, y = coords[:, 0], coords[:, 1]
+    extremes = [
+        int(np.argmin(x)),
+        int(np.argmin(x + y)),
+        int(np.argmin(y)),
+        int(np.argmax(x - y)),
+        int(np.argmax(x)),
+        int(np.argmax(x + y)),
+        int(np.argmax(y)),
+        int(np.argmax(y - x)),
+    ]
+    corners = [coords[index] for index in extremes]
+    corners = [
+        corner
+        for corner, following in zip(corners, corners[1:] + corners[:1])
+        if (corner != following).any()
+    ]
+    if len(corners) < 3:
+        return np.arange(len(coords))
+
+    inside = np.ones(len(coords), dtype=bool)
+    for (ax, ay), (bx, by) in zip(corners, corners[1:] + corners[:1]):
+        inside &= (bx - ax) * (y - ay) - (by - ay) * (x - ax) > 0
+    return np.flatnonzero(~inside)
+
+
+def convex_hull(coords: np.ndarray) -> np.ndarray:
+    if len(coords) < 3:
+        return np.arange(len(coords))
+
+    candidates = _interior_filter(coords)
+    order = candidates[np.lexsort((coords[candidates, 1], coords[candidates, 0]))]
+    points = coords[order].tolist()
+
+    lower: list[int] = []
+    upper: list[int] = []
+    for chain, indices in ((lower, range(len(order))), (upper, reversed(range(len(order))))):
+        for index in indices:
+            while len(chain) >= 2 and _cross(points[chain[-2]], points[chain[-1]], points[index]) <= 0:
+                chain.pop()
+            chain.append(index)
+
+    hull = lower[:-1] + upper[:-1]
+    return order[hull]
+
+
+def max_area_triangle(coords: np.ndarray) -> tuple[int, int, int] | None:
+    hull = convex_hull(coords)
+    h = len(hull)
+    if h < 3:
+        return None
+
+    x = coords[hull, 0]
+    y = coords[hull, 1]
+
+    def area2(i: np.ndarray, j: np.ndarray, k: np.ndarray) -> np.ndarray:
+        return (x[j] - x[i]) * (y[k] - y[i]) - (y[j] - y[i]) * (x[k] - x[i])
+
+    # For a fixed anchor i the farthest vertex k from edge (i, j) only moves
+    # forward as j advances along the hull, so each anchor needs at most 2h
+    # pointer steps. All anchors are stepped together, one vector op per step.
+    i = np.arange(h - 2)
+    j = i + 1
+    k = i + 2
+    current = area2(i, j, k)
+    best_area2 = current.copy()
+    best_j = j.copy()
+    best_k = k.copy()
+
+    active = np.arange(len(i))
+    while len(active):
+        ai, aj, ak = i[active], j[active], k[active]
+        following = np.where(ak + 1 < h, area2(ai, aj, np.minimum(ak + 1, h - 1)), -np.inf)
+        advance_k = following >= current[active]
+
+        moved_k = active[advance_k]
+        k[moved_k] += 1
+        current[moved_k] = following[advance_k]
+
+        moved_j = active[~advance_k]
+        improved = moved_j[current[moved_j] > best_area2[moved_j]]
+        best_area2[improved] = current[improved]
+        best_j[improved] = j[improved]
+        best_k[improved] = k[improved]
+        j[moved_j] += 1
+        k[moved_j] = np.maximum(k[moved_j], j[moved_j] + 1)
+
+        active = active[j[active] < h - 1]
+        current[active] = area2(i[active], j[active], k[active])
+
+    anchor = int(np.argmax(best_area2))
+    if best_area2[anchor] <= 0:
+        return None
+    triple = (anchor, int(best_j[anchor]), int(best_k[anchor]))
+    return tuple(sorted(int(hull[index]) for index in triple))  # type: ignore
@@ -0,0 +1,69 @@
+from typing import Callable, Generic, TypeVar
+import threading
+
+
+T = TypeVar("T")
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class SearchJob(Generic[T]):
+    # Runs target(*args, progress=..., **kwargs) on a worker thread. The
+    # worker only records progress under a lock; the UI polls it (e.g. from
+    # a matplotlib timer) and owns every redraw. Cancelling makes the next
+    # progress report raise SearchCancelled inside the worker, so targets
+    # stop at their next chunk boundary; chunk_size style arguments in
+    # kwargs control how often that is.
+    def __init__(self, target: Callable[..., T], *args, **kwargs) -> None:
+        self.target: Callable[..., T] = target
+        self.args = args
+        self.kwargs = kwargs
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+        self._lock = threading.Lock()
+        self._done: int = 0
+        self._total: int = 0
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "SearchJob[T]":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def progress(self) -> float:
+        with self._lock:
+            return self._done / self._total if self._total else 0.0
+
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def report(self, done: int, total: int) -> None:
+        if self._cancel.is_set():
+            raise SearchCancelled()
+        with self._lock:
+            self._done, self._total = done, total
+
+    def _run(self) -> None:
+        try:
+            self.result = self.target(*self.args, progress=self.report, **self.kwargs)
+        except SearchCancelled:
+            pass
+        except Exception as e:
+            self.error = e
+        finally:
+            self._finished.set()
@@ -0,0 +1,112 @@
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+
+# Array kernels shared by the scans, the sweep and the triangle batches.
+# This module imports nothing else from the package, so any of them can
+# use it at import time.
+
+Triple = tuple[int, int, int]
+
+DEFAULT_CHUNK_SIZE: int = 1 << 16
+# Largest coordinate magnitude for which doubled areas still fit in int64.
+MAX_EXACT_COORDINATE: int = 1 << 30
+
+
+class AreaBlock(NamedTuple):
+    # Doubled areas of the triples (i, j, k) with j = j_start + row and
+    # k = j_start + 1 + column. Only cells with column >= row (k > j) are
+    # distinct triples: the rest repeat an earlier triple or have j == k,
+    # so min/max scans can skip the mask as long as they ignore zeros.
+    i: int
+    j_start: int
+    areas2: np.ndarray
+
+    def valid_mask(self) -> np.ndarray:
+        rows, columns = self.areas2.shape
+        return np.arange(columns)[None, :] >= np.arange(rows)[:, None]
+
+    def valid_count(self) -> int:
+        rows, columns = self.areas2.shape
+        rows = min(rows, columns)
+        return rows * columns - rows * (rows - 1) // 2
+
+    def triple(self, flat_index: int) -> Triple:
+        row, column = divmod(int(flat_index), self.areas2.shape[1])
+        return tuple(sorted((self.i, self.j_start + row, self.j_start + 1 + column)))  # type: ignore
+
+
+def as_coords(coords) -> np.ndarray:
+    array = np.asarray(coords, dtype=np.float64)
+    if array.ndim != 2 or array.shape[1] != 2:
+        raise ValueError(f"Expected an (N, 2) coordinate array, got shape {array.shape}")
+    return array
+
+
+def as_integral_coords(coords) -> np.ndarray | None:
+    array = np.asarray(coords)
+    if array.dtype.kind in "iu":
+        integral = array.astype(np.int64)
+    else:
+        array = array.astype(np.float64)
+        if not np.isfinite(array).all() or (array != np.round(array)).any():
+            return None
+        integral = array.astype(np.int64)
+    if integral.size and np.abs(integral).max() >= MAX_EXACT_COORDINATE:
+        return None
+    return integral
+
+
+def as_exact_coords(coords) -> np.ndarray:
+    # The dtype picks the area kernel: int64 when every coordinate is
+    # integral and small enough that doubled areas cannot overflow, Python
+    # ints in an object array for larger integral input, float64 otherwise.
+    array = np.asarray(coords)
+    if array.ndim != 2 or array.shape[1] != 2:
+        raise ValueError(f"Expected an (N, 2) coordinate array, got shape {array.shape}")
+    integral = as_integral_coords(array)
+    if integral is not None:
+        return integral
+    if array.dtype.kind == "O" and all(isinstance(value, int) for value in array.flat):
+        return array
+    if array.dtype.kind in "iu":
+        return array.astype(object)
+    array = as_coords(array)
+    if np.isfinite(array).all() and (array == np.round(array)).all():
+        return np.array([[int(x), int(y)] for x, y in array.tolist()], dtype=object).reshape(-1, 2)
+    return array
+
+
+def unreachable_area2(areas2: np.ndarray):
+    # Stand-in for infinity that fits the dtype of a block.
+    return np.iinfo(np.int64).max if areas2.dtype == np.int64 else np.inf
+
+
+def triangles_count(n: int) -> int:
+    return n * (n - 1) * (n - 2) // 6
+
+
+def iter_area_blocks(
+    coords,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start: int = 0,
+    stop: int | None = None,
+) -> Iterator[AreaBlock]:
+    coords = as_exact_coords(coords)
+    n = len(coords)
+    stop = n if stop is None else min(stop, n)
+
+    for i in range(start, stop):
+        columns = n - i - 2
+        if columns <= 0:
+            continue
+        dx = coords[i + 1 :, 0] - coords[i, 0]
+        dy = coords[i + 1 :, 1] - coords[i, 1]
+        rows_per_block = max(1, chunk_size // columns)
+
+        for row in range(0, columns, rows_per_block):
+            row_end = min(row + rows_per_block, columns)
+            areas2 = dx[row:row_end, None] * dy[None, row + 1 :]
+            areas2 -= dy[row:row_end, None] * dx[None, row + 1 :]
+            yield AreaBlock(i, i + 1 + row, np.abs(areas2, out=areas2))
@@ -0,0 +1,109 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import os
+from typing import Callable, Iterator
+
+import numpy as np
+
+from .kernels import DEFAULT_CHUNK_SIZE, Triple, as_exact_coords, triangles_count
+from .search import ProgressCallback, brute_force_min_max
+
+
+SHARDS_PER_PROCESS: int = 8
+
+_shared_memory: shared_memory.SharedMemory | None = None
+_shared_coords: np.ndarray | None = None
+
+
+def shard_bounds(n: int, shards: int) -> list[tuple[int, int]]:
+    # Outer index i owns C(n - i - 1, 2) triples, so equal-width ranges would
+    # leave the first shard with most of the work. Split by cumulative work.
+    remaining = np.arange(n - 1, -1, -1, dtype=np.float64)
+    work = np.cumsum(remaining * (remaining - 1) / 2)
+    if n < 3 or work[-1] == 0:
+        return [(0, n)]
+    targets = work[-1] * np.arange(1, shards) / shards
+    cuts = np.unique(np.concatenate(([0], np.searchsorted(work, targets) + 1, [n])))
+    return [(int(start), int(stop)) for start, stop in zip(cuts[:-1], cuts[1:])]
+
+
+def _attach(name: str, shape: tuple[int, int], dtype: str) -> None:
+    global _shared_memory, _shared_coords
+    _shared_memory = shared_memory.SharedMemory(name=name)
+    _shared_coords = np.ndarray(shape, dtype=dtype, buffer=_shared_memory.buf)
+
+
+def _scan_shard(function: Callable, start: int, stop: int, args: tuple):
+    return function(_shared_coords, *args, start=start, stop=stop)
+
+
+def map_shards(
+    coords,
+    function: Callable,
+    args: tuple = (),
+    processes: int | None = None,
+    progress: ProgressCallback | None = None,
+) -> Iterator:
+    # Runs function(coords, *args, start=..., stop=...) over work-balanced
+    # outer-index shards in a process pool and yields the shard results in
+    # completion order. function must be importable by the workers.
+    coords = as_exact_coords(coords)
+    n = len(coords)
+    processes = processes or os.cpu_count() or 1
+    shards = shard_bounds(n, processes * SHARDS_PER_PROCESS)
+    total = triangles_count(n)
+    done = 0
+
+    if coords.dtype == object:
+        # Python ints cannot live in shared memory; such huge coordinates
+        # are rare enough to scan in this process.
+        for start, stop in shards:
+            yield function(coords, *args, start=start, stop=stop)
+            if progress is not None:
+                done += triangles_count(n - start) - triangles_count(n - stop)
+                progress(done, total)
+        return
+
+    memory = shared_memory.SharedMemory(create=True, size=max(coords.nbytes, 1))
+    try:
+        np.ndarray(coords.shape, dtype=coords.dtype, buffer=memory.buf)[:] = coords
+        with ProcessPoolExecutor(
+            processes, initializer=_attach, initargs=(memory.name, coords.shape, coords.dtype.str)
+        ) as pool:
+            futures = {
+                pool.submit(_scan_shard, function, start, stop, args): (start, stop)
+                for start, stop in shards
+            }
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+                    if progress is not None:
+                        start, stop = futures[future]
+                        done += triangles_count(n - start) - triangles_count(n - stop)
+                        progress(done, total)
+            except BaseException:
+                # Cancelled or failed: drop the shards that have not started.
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def parallel_min_max(
+    coords,
+    processes: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+) -> tuple[tuple[float, Triple | None], tuple[float, Triple | None]]:
+    best_min: tuple[float, Triple | None] = (np.inf, None)
+    best_max: tuple[float, Triple | None] = (0, None)
+    for shard_min, shard_max in map_shards(
+        coords, brute_force_min_max, (chunk_size,), processes, progress
+    ):
+        if shard_min[1] is not None and shard_min[0] < best_min[0]:
+            best_min = shard_min
+        if shard_max[1] is not None and shard_max[0] > best_max[0]:
+            best_max = shard_max
+    return best_min, best_max
@@ -0,0 +1,266 @@
+from typing import BinaryIO, Iterator, NamedTuple
+import os
+import re
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+
+DEFAULT_BUFFER_SIZE: int = 1 << 20
+
+# Binary point files: a 64 byte header followed by three little-endian
+# columns, x and y as float64 and the point numbers as int64.
+BINARY_MAGIC: bytes = b"PCPLPTS\0"
+BINARY_VERSION: int = 1
+BINARY_HEADER = struct.Struct("<8sIIQ")
+BINARY_HEADER_SIZE: int = 64
+
+_NUMBER = rb"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+POINT_PATTERN = re.compile(rb"\[\s*(" + _NUMBER + rb")\s*,\s*(" + _NUMBER + rb")\s*\]")
+# Longest text kept from an unterminated tail; real tokens are far shorter.
+MAX_TOKEN_SIZE: int = 1024
+
+_WHITESPACE_BYTES = b" \t\r\n"
+_NUMBER_BYTES = b"0123456789+-.eE" + _WHITESPACE_BYTES
+_SEPARATOR_BYTES = b",;" + _WHITESPACE_BYTES
+_PUNCTUATION_TO_SPACE = bytes.maketrans(b"[],;", b"    ")
+
+
+def _parse_strict(text: bytes) -> np.ndarray | None:
+    # Fast path for well-formed buffers: with the numbers stripped out only
+    # "[,]" skeletons and separators may remain, and no two numbers may be
+    # split by whitespace alone. Then every word is one coordinate.
+    # Anything else goes to the regex.
+    skeleton = text.translate(None, _NUMBER_BYTES)
+    tokens = skeleton.count(b"[,]")
+    if skeleton.replace(b"[,]", b"").translate(None, _SEPARATOR_BYTES):
+        return None
+    words = text.translate(_PUNCTUATION_TO_SPACE).split()
+    if len(words) != 2 * tokens:
+        return None
+    if len(text.translate(_PUNCTUATION_TO_SPACE, _WHITESPACE_BYTES).split()) != len(words):
+        return None
+    try:
+        return np.array(words, dtype=np.float64).reshape(-1, 2)
+    except ValueError:
+        return None
+
+
+def _parse(text: bytes) -> np.ndarray:
+    values = _parse_strict(text)
+    if values is not None:
+        return values
+    matches = POINT_PATTERN.findall(text)
+    if not matches:
+        return np.empty((0, 2), dtype=np.float64)
+    return np.array(matches, dtype=np.bytes_).astype(np.float64)
+
+
+def iter_point_chunks(
+    pointlist: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> Iterator[np.ndarray]:
+    tail = b""
+    while True:
+        buffer = pointlist.read(buffer_size)
+        if not buffer:
+            break
+        text = tail + buffer
+
+        # Every token ends with "]", so cutting right after the last one
+        # leaves only the beginning of a token that spans the boundary.
+        end = text.rfind(b"]") + 1
+        tail = text[end:]
+        if len(tail) > MAX_TOKEN_SIZE:
+            start = tail.rfind(b"[")
+            tail = tail[start:] if start >= 0 and len(tail) - start <= MAX_TOKEN_SIZE else b""
+
+        chunk = _parse(text[:end])
+        if len(chunk):
+            yield chunk
+
+
+def read_points(file_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE, unique: bool = False) -> np.ndarray:
+    seen = UniqueFilter() if unique else None
+    with open(file_path, "rb") as pointlist:
+        chunks = [
+            chunk if seen is None else chunk[seen.keep(chunk)]
+            for chunk in iter_point_chunks(pointlist, buffer_size)
+        ]
+    if not chunks:
+        return np.empty((0, 2), dtype=np.float64)
+    return np.concatenate(chunks)
+
+
+def unique_rows(coords) -> np.ndarray:
+    # Indices of the first occurrence of every distinct (x, y), in file
+    # order. -0.0 and 0.0 are the same coordinate.
+    coords = np.ascontiguousarray(np.asarray(coords, dtype=np.float64).reshape(-1, 2) + 0.0)
+    keys = coords.view(np.dtype((np.void, 2 * coords.itemsize))).ravel()
+    _, first = np.unique(keys, return_index=True)
+    return np.sort(first)
+
+
+class UniqueFilter:
+    # Streaming counterpart of unique_rows: keep(chunk) masks the rows whose
+    # coordinates appear neither earlier in the chunk nor in any earlier
+    # chunk. Seen coordinates are kept as their float64 bit patterns in an
+    # open-addressing hash table, so memory grows with the unique points
+    # only and nothing beyond one chunk is ever sorted.
+    MAX_LOAD: float = 0.7
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        capacity = 1 << max(int(capacity) - 1, 1).bit_length()
+        self._keys = np.empty((capacity, 2), dtype=np.uint64)
+        self._used = np.zeros(capacity, dtype=bool)
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _slots(keys: np.ndarray, mask: int) -> np.ndarray:
+        # Multiplicative hashing, reading the top bits: the low bits of
+        # small integral floats are all zero and would all collide.
+        mixed = keys[:, 0] * np.uint64(0x9E3779B97F4A7C15)
+        mixed ^= mixed >> np.uint64(32)
+        mixed += keys[:, 1]
+        mixed *= np.uint64(0xC2B2AE3D27D4EB4F)
+        return (mixed >> np.uint64(64 - mask.bit_length())).astype(np.intp)
+
+    def _insert(self, keys: np.ndarray) -> np.ndarray:
+        # Inserts distinct keys; returns a mask of those not already present.
+        fresh = np.zeros(len(keys), dtype=bool)
+        mask = len(self._used) - 1
+        rows = np.arange(len(keys))
+        slots = self._slots(keys, mask)
+        # Linear probing, one step per round for all unresolved keys. When
+        # several claim one empty slot the last write wins and the rest
+        # probe on; the keys are distinct, so the slot names its winner.
+        while len(rows):
+            used = self._used[slots]
+            found = used & (self._keys[slots] == keys[rows]).all(axis=1)
+            empty = np.flatnonzero(~used)
+            self._keys[slots[empty]] = keys[rows[empty]]
+            claimed = empty[(self._keys[slots[empty]] == keys[rows[empty]]).all(axis=1)]
+            self._used[slots[claimed]] = True
+            fresh[rows[claimed]] = True
+            self._size += len(claimed)
+
+            pending = ~found
+            pending[claimed] = False
+            rows, slots, used = rows[pending], slots[pending], used[pending]
+            slots[used] = (slots[used] + 1) & mask
+        return fresh
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._used)
+        if size <= self.MAX_LOAD * capacity:
+            return
+        while size > self.MAX_LOAD * capacity:
+            capacity *= 2
+        keys = self._keys[self._used]
+        self._keys = np.empty((capacity, 2), dtype=np.uint64)
+        self._used = np.zeros(capacity, dtype=bool)
+        self._size = 0
+        self._insert(keys)
+
+    def keep(self, coords) -> np.ndarray:
+        # Adding 0.0 folds -0.0 into 0.0 before the bits are compared.
+        coords = np.ascontiguousarray(np.asarray(coords, dtype=np.float64).reshape(-1, 2) + 0.0)
+        first = unique_rows(coords)
+        self._reserve(self._size + len(first))
+        keep = np.zeros(len(coords), dtype=bool)
+        keep[first[self._insert(coords.view(np.uint64)[first])]] = True
+        return keep
+
+
+class PointColumns(NamedTuple):
+    numbers: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+
+    @property
+    def coords(self) -> np.ndarray:
+        return np.column_stack((self.x, self.y))
+
+    def iter_chunks(self, size: int = DEFAULT_BUFFER_SIZE // 16) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        # (numbers, coords) blocks, so a memory-mapped file is read a block
+        # at a time rather than stacked into one array.
+        for start in range(0, len(self.numbers), size):
+            stop = start + size
+            yield np.asarray(self.numbers[start:stop]), np.column_stack((self.x[start:stop], self.y[start:stop]))
+
+
+def _binary_header(count: int) -> bytes:
+    return BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, count).ljust(BINARY_HEADER_SIZE, b"\0")
+
+
+def is_binary_point_file(file_path: str) -> bool:
+    with open(file_path, "rb") as pointfile:
+        return pointfile.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def write_binary_points(file_path: str, coords, numbers=None) -> None:
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if numbers is None:
+        numbers = np.arange(1, len(coords) + 1)
+    numbers = np.asarray(numbers, dtype="<i8")
+    if len(numbers) != len(coords):
+        raise ValueError("numbers and coords must have the same length")
+
+    with open(file_path, "wb") as pointfile:
+        pointfile.write(_binary_header(len(coords)))
+        coords[:, 0].astype("<f8").tofile(pointfile)
+        coords[:, 1].astype("<f8").tofile(pointfile)
+        numbers.tofile(pointfile)
+
+
+def open_binary_points(file_path: str) -> PointColumns:
+    with open(file_path, "rb") as pointfile:
+        header = pointfile.read(BINARY_HEADER_SIZE)
+    if len(header) < BINARY_HEADER_SIZE:
+        raise ValueError(f"{file_path} is too short for a binary point file")
+    magic, version, _, count = BINARY_HEADER.unpack_from(header)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"{file_path} is not a binary point file")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary point file version {version}")
+    if os.path.getsize(file_path) < BINARY_HEADER_SIZE + 24 * count:
+        raise ValueError(f"{file_path} is truncated")
+    if count == 0:
+        return PointColumns(np.empty(0, np.int64), np.empty(0), np.empty(0))
+
+    def column(dtype: str, index: int) -> np.ndarray:
+        offset = BINARY_HEADER_SIZE + 8 * count * index
+        return np.memmap(file_path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+    return PointColumns(column("<i8", 2), column("<f8", 0), column("<f8", 1))
+
+
+def convert_text_to_binary(
+    source_path: str, target_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> int:
+    # The point count is only known at the end, so x is written straight
+    # after a placeholder header while y is spooled to a temporary file.
+    count = 0
+    with (
+        open(source_path, "rb") as pointlist,
+        open(target_path, "wb") as target,
+        tempfile.TemporaryFile() as y_column,
+    ):
+        target.write(_binary_header(0))
+        for coords in iter_point_chunks(pointlist, buffer_size):
+            coords[:, 0].astype("<f8").tofile(target)
+            coords[:, 1].astype("<f8").tofile(y_column)
+            count += len(coords)
+
+        y_column.seek(0)
+        shutil.copyfileobj(y_column, target)
+        for start in range(0, count, buffer_size):
+            stop = min(start + buffer_size, count)
+            np.arange(start + 1, stop + 1, dtype="<i8").tofile(target)
+        target.seek(0)
+        target.write(_binary_header(count))
+    return count
@@ -1,106 +1,144 @@
-from typing import Literal
+from typing import Iterator
 import numpy as np
 
+from .geometry import Point
 
-class Point:
-    def __init__(self, number: int, x: float, y: float) -> None:
-        self.number: int = number
-        self.x: float = x
-        self.y: float = y
-
-
-class PointsDraw:
-    def __init__(
-        self,
-        axes,
-        color,
-        scale: int = 3,
-    ) -> None:
-        self.pointCount = 1
-        self.axes = axes
-        self.scale: int = scale
-        self.list: list[Point] = []
-        self.draw = self.axes.scatter([], [], s=scale, c=color)
-
-        self.annotation = self.axes.annotate(
-            "",
-            xy=(0, 0),
-            xytext=(10, -20),
-            textcoords="offset points",
-            bbox=dict(boxstyle="round", fc="w"),
-        )
-        self.annotation.set_visible(False)
-
-        self.axes.figure.canvas.mpl_connect("motion_notify_event", self.on_hover)
-        self.axes.figure.canvas.mpl_connect("axes_leave_event", self.on_leave)
-
-    def add_point(self, point: Point) -> ValueError | None:
-        if point.number in [point.number for point in self.list]:
-            return ValueError(f"A point with {point.number} number already exists")
-        self.pointCount += 1
-        self.list.append(point)
-
-    def add_point_with_coordinates(self, x: float, y: float) -> None:
-        point = Point(self.pointCount, x, y)
-        self.pointCount += 1
-        self.list.append(point)
-
-    def update_draw(self):
-        coords: list[tuple[float, float]] = [(point.x, point.y) for point in self.list]
-        self.draw.set_offsets(coords)
-        self.adjust_axis_limits()
-        self.axes.figure.canvas.draw_idle()
-
-    def adjust_axis_limits(self) -> None:
-        if not self.list:
-            return
 
-        x_values, y_values = zip(*[(point.x, point.y) for point in self.list])
+class PointStore:
+    def __init__(self, capacity: int = 64) -> None:
+        self._numbers = np.empty(capacity, dtype=np.int64)
+        self._coords = np.empty((capacity, 2), dtype=np.float64)
+        self._size: int = 0
+        self._rows: dict[int, int] = {}
 
-        x_min, x_max = min(x_values), max(x_values)
-        y_min, y_max = min(y_values), max(y_values)
+    def __len__(self) -> int:
+        return self._size
 
-        buffer = 5
-        self.axes.set_xlim(x_min - buffer, x_max + buffer)
-        self.axes.set_ylim(y_min - buffer, y_max + buffer)
+    def __contains__(self, number: int) -> bool:
+        return number in self._rows
 
-    def on_point(self, x, y) -> Point | None:
-        if not self.list:
-            return
+    def __getitem__(self, row: int) -> Point:
+        if not -self._size <= row < self._size:
+            raise IndexError(f"Row {row} is out of range")
+        x, y = self._coords[row].tolist()
+        return Point(int(self._numbers[row]), x, y)
 
-        valid_points = [
-            point
-            for point in self.list
-            if np.sqrt((point.x - x) ** 2 + (point.y - y) ** 2) <= self.scale * 0.1
-        ]
+    def __iter__(self) -> Iterator[Point]:
+        for number, (x, y) in zip(self.numbers.tolist(), self.coords.tolist()):
+            yield Point(number, x, y)
+
+    @property
+    def numbers(self) -> np.ndarray:
+        return self._numbers[: self._size]
+
+    @property
+    def coords(self) -> np.ndarray:
+        return self._coords[: self._size]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._coords[: self._size, 0]
 
-        return min(
-            valid_points,
-            key=lambda point: np.sqrt((point.x - x) ** 2 + (point.y - y) ** 2),
-            default=None,
-        )
-
-    def on_hover(self, event) -> None:
-        if (
-            event.inaxes is not None
-            and event.xdata is not None
-            and event.ydata is not None
-        ):
-            point = self.on_point(event.xdata, event.ydata)
-            if point:
-                self.update_annotation(point)
-                self.annotation.set_visible(True)
-                self.axes.figure.canvas.draw_idle()
-            else:
-                self.annotation.set_visible(False)
-                self.axes.figure.canvas.draw_idle()
-
-    def on_leave(self, event) -> None:
-        self.annotation.set_visible(False)
-        self.axes.figure.canvas.draw_idle()
-
-    def update_annotation(self, point):
-        x, y = point.x, point.y
-        self.annotation.xy = (x, y)
-        self.annotation.set_text(f"Point {point.number}: [{x:.0f}, {y:.0f}]")
-        self.axes.figure.canvas.draw_idle()
+    @property
+    def y(self) -> np.ndarray:
+        return self._coords[: self._size, 1]
+
+    def row_of(self, number: int) -> int | None:
+        return self._rows.get(number)
+
+    def get(self, number: int) -> Point | None:
+        row = self._rows.get(number)
+        return None if row is None else self[row]
+
+    def reserve(self, capacity: int) -> None:
+        if capacity <= len(self._numbers):
+            return
+        capacity = max(capacity, 2 * len(self._numbers))
+        numbers = np.empty(capacity, dtype=np.int64)
+        coords = np.empty((capacity, 2), dtype=np.float64)
+        numbers[: self._size] = self.numbers
+        coords[: self._size] = self.coords
+        self._numbers, self._coords = numbers, coords
+
+    def add(self, number: int, x: float, y: float) -> None:
+        if number in self._rows:
+            raise ValueError(f"A point with {number} number already exists")
+        self.reserve(self._size + 1)
+        self._numbers[self._size] = number
+        self._coords[self._size] = (x, y)
+        self._rows[number] = self._size
+        self._size += 1
+
+    def extend(self, numbers, coords) -> None:
+        numbers = np.asarray(numbers, dtype=np.int64)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        if len(numbers) != len(coords):
+            raise ValueError("numbers and coords must have the same length")
+        number_list = numbers.tolist()
+        if len(set(number_list)) != len(number_list) or not self._rows.keys().isdisjoint(number_list):
+            raise ValueError("Point numbers must be unique")
+
+        start = self._size
+        self.reserve(start + len(numbers))
+        self._numbers[start : start + len(numbers)] = numbers
+        self._coords[start : start + len(numbers)] = coords
+        self._rows.update(zip(number_list, range(start, start + len(numbers))))
+        self._size += len(numbers)
+
+    def remove(self, number: int) -> int:
+        # Swap-remove: the last row moves into the freed slot. Returns the
+        # freed row so parallel per-row arrays can be moved the same way.
+        row = self._rows.pop(number, None)
+        if row is None:
+            raise ValueError(f"A point with {number} number does not exist")
+        last = self._size - 1
+        if row != last:
+            self._numbers[row] = self._numbers[last]
+            self._coords[row] = self._coords[last]
+            self._rows[int(self._numbers[row])] = row
+        self._size = last
+        return row
+
+    def clear(self) -> None:
+        self._size = 0
+        self._rows.clear()
+
+
+class GridIndex:
+    def __init__(self, cell_size: float) -> None:
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size: float = cell_size
+        self.cells: dict[tuple[int, int], list[int]] = {}
+
+    def insert_many(self, rows: np.ndarray, coords: np.ndarray) -> None:
+        if not len(rows):
+            return
+        keys = np.floor(coords / self.cell_size).astype(np.int64)
+        unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind="stable")
+        bounds = np.searchsorted(inverse.ravel()[order], np.arange(len(unique_keys) + 1))
+        for (cx, cy), start, stop in zip(unique_keys.tolist(), bounds[:-1], bounds[1:]):
+            self.cells.setdefault((cx, cy), []).extend(rows[order[start:stop]].tolist())
+
+    def clear(self) -> None:
+        self.cells.clear()
+
+    def nearest(self, coords: np.ndarray, x: float, y: float, radius: float) -> int | None:
+        reach = int(np.ceil(radius / self.cell_size))
+        cx, cy = int(np.floor(x / self.cell_size)), int(np.floor(y / self.cell_size))
+        candidates = [
+            row
+            for dx in range(-reach, reach + 1)
+            for dy in range(-reach, reach + 1)
+            for row in self.cells.get((cx + dx, cy + dy), ())
+        ]
+        if not candidates:
+            return None
+
+        rows = np.array(candidates)
+        distances = (coords[rows, 0] - x) ** 2 + (coords[rows, 1] - y) ** 2
+        best = int(np.argmin(distances))
+        if distances[best] > radius**2:
+            return None
+        return int(rows[best])
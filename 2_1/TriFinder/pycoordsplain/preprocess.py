@@ -0,0 +1,120 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .kernels import as_coords, as_integral_coords
+from .pointfile import unique_rows
+from .search import ProgressCallback
+
+
+# Pairs keyed per block of pivots in the collinear pass.
+PIVOT_BLOCK_SIZE: int = 1 << 18
+# Distinct slopes p / q and r / s differ by at least 1 / (q * s), more than
+# float64 rounding can bridge while |p| * s <= 2**52. Point sets whose x and
+# y extents multiply to at most this compare slopes as floats.
+SLOPE_SPAN: int = 1 << 52
+
+
+class PreprocessStats(NamedTuple):
+    points: int
+    duplicates: int
+    # Degenerate triples among the unique points and the most unique points
+    # on one line; None when the collinear pass was skipped or the
+    # coordinates are not integral.
+    collinear_triples: int | None = None
+    longest_line: int | None = None
+
+
+class Preprocessed(NamedTuple):
+    # rows are the kept input rows, in input order; coords are their points.
+    rows: np.ndarray
+    coords: np.ndarray
+    stats: PreprocessStats
+
+
+def _directions(coords: np.ndarray, pivots: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Directions from each pivot to every point, turned into the right
+    # half-plane so the two directions along one line become the same, and
+    # a mask of the points after their pivot.
+    dx = coords[None, :, 0] - coords[pivots, 0, None]
+    dy = coords[None, :, 1] - coords[pivots, 1, None]
+    flip = (dx < 0) | ((dx == 0) & (dy < 0))
+    np.negative(dx, out=dx, where=flip)
+    np.negative(dy, out=dy, where=flip)
+    return dx, dy, np.arange(len(coords))[None, :] > pivots[:, None]
+
+
+def _direction_keys(coords: np.ndarray, pivots: np.ndarray) -> np.ndarray:
+    # One int64 key per (pivot, point) pair naming the line through both:
+    # the direction reduced by its gcd. With coordinates below 2**30 the
+    # reduced dx fits in 31 bits and dy in 32, so the key packs both
+    # exactly. Points at or before their pivot get distinct negative keys.
+    dx, dy, after = _directions(coords, pivots)
+    divisors = np.gcd(dx, dy)
+    divisors[divisors == 0] = 1
+    keys = (dx // divisors << 32) + (dy // divisors + (1 << 31))
+    return np.where(after, keys, -1 - np.arange(len(coords))[None, :])
+
+
+def _run_offsets(continues: np.ndarray) -> np.ndarray:
+    # continues[..., i] tells whether sorted element i + 1 is on the same
+    # line as element i. Returns every element's offset within its run; a
+    # run of m points through a pivot holds m * (m - 1) / 2 degenerate
+    # triples, which is the sum of its offsets.
+    shape = continues.shape[:-1] + (continues.shape[-1] + 1,)
+    positions = np.broadcast_to(np.arange(shape[-1]), shape)
+    new_run = np.ones(shape, dtype=bool)
+    new_run[..., 1:] = ~continues
+    return positions - np.maximum.accumulate(np.where(new_run, positions, 0), axis=-1)
+
+
+def _key_offsets(keys: np.ndarray) -> np.ndarray:
+    keys = np.sort(keys, axis=-1)
+    return _run_offsets(keys[..., 1:] == keys[..., :-1])
+
+
+def _slope_offsets(coords: np.ndarray, pivots: np.ndarray) -> np.ndarray:
+    # _key_offsets(_direction_keys(...)) without the gcds, which dominate
+    # its cost: points on one line through a pivot have slopes dy / dx of
+    # one rational value, which division rounds to the same float. Only
+    # exact while distinct slopes cannot round together, see SLOPE_SPAN.
+    dx, dy, after = _directions(coords, pivots)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.where(after, dy / dx, np.nan)
+    slopes.sort(axis=-1)
+    return _run_offsets(slopes[:, 1:] == slopes[:, :-1])
+
+
+def preprocess(coords, collinear: bool = True, progress: ProgressCallback | None = None) -> Preprocessed:
+    # Drops repeated coordinates and, for integral input, counts the
+    # degenerate triples left among the unique points by grouping them per
+    # pivot. The collinear pass only reports statistics: no scan skips the
+    # triples it finds. It is O(N^2 log N); pass collinear=False to only
+    # dedup.
+    coords = as_coords(coords)
+    rows = unique_rows(coords)
+    unique = coords[rows]
+    stats = PreprocessStats(len(coords), len(coords) - len(rows))
+
+    integral = as_integral_coords(unique) if collinear else None
+    if integral is not None:
+        n = len(integral)
+        collinear_triples = 0
+        longest = min(n, 2)
+        spans = integral.max(axis=0) - integral.min(axis=0) if n else (0, 0)
+        exact = int(spans[0]) * int(spans[1]) > SLOPE_SPAN
+        block = max(1, PIVOT_BLOCK_SIZE // max(n, 1))
+        for start in range(0, max(n - 2, 0), block):
+            stop = min(start + block, n - 2)
+            # Points before the block pair with none of its pivots.
+            pivots = np.arange(stop - start)
+            if exact:
+                offsets = _key_offsets(_direction_keys(integral[start:], pivots))
+            else:
+                offsets = _slope_offsets(integral[start:], pivots)
+            collinear_triples += int(offsets.sum())
+            longest = max(longest, int(offsets.max()) + 2)
+            if progress is not None:
+                progress(stop, n - 2)
+        stats = stats._replace(collinear_triples=collinear_triples, longest_line=longest)
+    return Preprocessed(rows, unique, stats)
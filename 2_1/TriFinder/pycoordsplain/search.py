@@ -0,0 +1,160 @@
+from typing import Callable, NamedTuple
+import heapq
+
+import numpy as np
+
+from .hull import max_area_triangle
+from .kernels import (
+    DEFAULT_CHUNK_SIZE,
+    AreaBlock,
+    Triple,
+    as_coords,
+    as_exact_coords,
+    iter_area_blocks,
+    triangles_count,
+    unreachable_area2,
+)
+from .triangles import min_area_triangle
+
+
+ProgressCallback = Callable[[int, int], None]
+
+# Below this size the vectorized O(N^3) scan beats the O(N^2 log N) sweep,
+# whose inner loop runs in Python.
+SWEEP_MIN_POINTS: int = 2000
+
+
+class MinMaxResult(NamedTuple):
+    min_triple: Triple | None
+    min_area: float
+    max_triple: Triple | None
+    max_area: float
+
+
+class TopKResult(NamedTuple):
+    # (area, triple) pairs, smallest ascending and largest descending.
+    smallest: list[tuple[float, Triple]]
+    largest: list[tuple[float, Triple]]
+
+
+def triangle_area(coords, triple: Triple) -> float:
+    (x1, y1), (x2, y2), (x3, y3) = (as_exact_coords(coords)[index].tolist() for index in triple)
+    return abs((x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1)) / 2
+
+
+def brute_force_min_max(
+    coords,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start: int = 0,
+    stop: int | None = None,
+    progress: ProgressCallback | None = None,
+) -> tuple[tuple[float, Triple | None], tuple[float, Triple | None]]:
+    coords = as_exact_coords(coords)
+    best_min: tuple[float, Triple | None] = (np.inf, None)
+    best_max: tuple[float, Triple | None] = (0, None)
+
+    total = triangles_count(len(coords))
+    done = 0
+    for block in iter_area_blocks(coords, chunk_size, start, stop):
+        areas2 = block.areas2
+        unreachable = unreachable_area2(areas2)
+
+        # Full reductions are cheaper than arg-reductions, so locate the
+        # triple only when the block improves on the current best.
+        if areas2.max() > best_max[0]:
+            max_index = int(np.argmax(areas2))
+            best_max = (areas2.item(max_index), block.triple(max_index))
+
+        # Cells with j == k lie on the first subdiagonal and are always zero.
+        rows = np.arange(1, min(areas2.shape[0], areas2.shape[1] + 1))
+        areas2[rows, rows - 1] = unreachable
+        block_min = areas2.min()
+        if block_min == 0:
+            areas2[areas2 == 0] = unreachable
+            block_min = areas2.min()
+        if block_min < best_min[0] and block_min != unreachable:
+            min_index = int(np.argmin(areas2))
+            best_min = (areas2.item(min_index), block.triple(min_index))
+
+        if progress is not None:
+            done += block.valid_count()
+            progress(done, total)
+
+    return best_min, best_max
+
+
+def use_sweep(coords: np.ndarray, processes: int = 1) -> bool:
+    # The sweep needs int64 coordinates and runs on one core, while the
+    # O(N^3) scan splits across processes; with p workers the crossover
+    # moves out roughly p-fold, since the scan's cost per worker drops by p.
+    return coords.dtype == np.int64 and len(coords) >= SWEEP_MIN_POINTS * max(processes, 1)
+
+
+def min_max_triangle(
+    coords,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+    processes: int = 1,
+) -> MinMaxResult:
+    coords = as_exact_coords(coords)
+    if use_sweep(coords, processes):
+        min_triple = min_area_triangle(coords, progress)
+    elif processes > 1:
+        from .parallel import parallel_min_max
+
+        (_, min_triple), _ = parallel_min_max(coords, processes, chunk_size, progress)
+    else:
+        (_, min_triple), _ = brute_force_min_max(coords, chunk_size, progress=progress)
+    max_triple = max_area_triangle(as_coords(coords))
+    return MinMaxResult(
+        min_triple,
+        triangle_area(coords, min_triple) if min_triple is not None else 0.0,
+        max_triple,
+        triangle_area(coords, max_triple) if max_triple is not None else 0.0,
+    )
+
+
+def top_k_triangles(
+    coords,
+    k: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+) -> TopKResult:
+    if k < 1:
+        raise ValueError("k must be positive")
+    coords = as_exact_coords(coords)
+    # Bounded heaps whose roots are the current K-th best: a min-heap of
+    # doubled areas for the largest and a min-heap of negated ones for the
+    # smallest. Degenerate triangles never enter either.
+    smallest: list[tuple[float, Triple]] = []
+    largest: list[tuple[float, Triple]] = []
+
+    def offer(heap: list[tuple[float, Triple]], keys: np.ndarray, block: AreaBlock, cells: np.ndarray) -> None:
+        if len(cells) > k:
+            cells = cells[np.argpartition(keys[cells], len(cells) - k)[len(cells) - k :]]
+        for cell, key in zip(cells.tolist(), keys[cells].tolist()):
+            if len(heap) < k:
+                heapq.heappush(heap, (key, block.triple(cell)))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, block.triple(cell)))
+
+    total = triangles_count(len(coords))
+    done = 0
+    for block in iter_area_blocks(coords, chunk_size):
+        areas2 = block.areas2.ravel()
+        valid = block.valid_mask().ravel() & (areas2 > 0)
+
+        # Only cells that beat the current K-th best reach the heaps.
+        threshold = largest[0][0] if len(largest) == k else 0
+        offer(largest, areas2, block, np.flatnonzero(valid & (areas2 > threshold)))
+        threshold = -smallest[0][0] if len(smallest) == k else np.inf
+        offer(smallest, -areas2, block, np.flatnonzero(valid & (areas2 < threshold)))
+
+        if progress is not None:
+            done += block.valid_count()
+            progress(done, total)
+
+    return TopKResult(
+        [(-area2 / 2, triple) for area2, triple in sorted(smallest, reverse=True)],
+        [(area2 / 2, triple) for area2, triple in sorted(largest, reverse=True)],
+    )
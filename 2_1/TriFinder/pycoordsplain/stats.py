@@ -0,0 +1,165 @@
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+from .hull import max_area_triangle
+from .kernels import DEFAULT_CHUNK_SIZE, Triple, as_coords, as_exact_coords, iter_area_blocks, triangles_count
+from .search import ProgressCallback, triangle_area
+
+
+# Two-sided 95% normal quantile used for the sampling error bounds.
+CONFIDENCE_Z: float = 1.96
+
+
+class AreaHistogram(NamedTuple):
+    # Counts of non-degenerate triangles per area bin. In sampling mode the
+    # counts are estimates and errors holds their 95% half-widths.
+    counts: np.ndarray
+    edges: np.ndarray
+    errors: np.ndarray | None = None
+
+
+class AreaCount(NamedTuple):
+    count: float
+    error: float = 0.0
+
+
+def _valid_areas2(block) -> np.ndarray:
+    # Each triple once, degenerate triangles left out.
+    areas2 = block.areas2[block.valid_mask()]
+    return areas2[areas2 > 0]
+
+
+def _bin_counts(areas2: np.ndarray, edges2: np.ndarray) -> np.ndarray:
+    # np.histogram with uniform bins, minus its per-call overhead, which
+    # dominates on small blocks. Values are binned by scaling and then
+    # nudged across edges that rounding put them on the wrong side of.
+    bins = len(edges2) - 1
+    areas2 = areas2[(areas2 >= edges2[0]) & (areas2 <= edges2[-1])]
+    indices = ((areas2 - edges2[0]) * (bins / (edges2[-1] - edges2[0]))).astype(np.intp)
+    np.minimum(indices, bins - 1, out=indices)
+    indices[areas2 < edges2[indices]] -= 1
+    indices[(areas2 >= edges2[indices + 1]) & (indices != bins - 1)] += 1
+    return np.bincount(indices, minlength=bins)
+
+
+def sample_triples(n: int, samples: int, rng: np.random.Generator) -> np.ndarray:
+    # Uniform over unordered triples of distinct indices: draw ordered
+    # triples and reject those that repeat an index.
+    if n < 3:
+        raise ValueError("Sampling needs at least 3 points")
+    triples = np.empty((0, 3), dtype=np.int64)
+    while len(triples) < samples:
+        drawn = rng.integers(0, n, size=(2 * (samples - len(triples)) + 16, 3))
+        distinct = (drawn[:, 0] != drawn[:, 1]) & (drawn[:, 0] != drawn[:, 2]) & (drawn[:, 1] != drawn[:, 2])
+        triples = np.concatenate((triples, drawn[distinct]))
+    return triples[:samples]
+
+
+def _sampled_areas2(coords: np.ndarray, samples: int, seed: int | None) -> np.ndarray:
+    i, j, k = sample_triples(len(coords), samples, np.random.default_rng(seed)).T
+    areas2 = (coords[j, 0] - coords[i, 0]) * (coords[k, 1] - coords[i, 1])
+    areas2 -= (coords[j, 1] - coords[i, 1]) * (coords[k, 0] - coords[i, 0])
+    return np.abs(areas2)
+
+
+def _estimate(hits, samples: int, total: int) -> tuple[np.ndarray, np.ndarray]:
+    # Binomial proportion scaled to the number of triples.
+    share = np.asarray(hits, dtype=np.float64) / samples
+    return share * total, CONFIDENCE_Z * np.sqrt(share * (1 - share) / samples) * total
+
+
+def _histogram_shard(coords, edges2: np.ndarray, chunk_size: int, start=0, stop=None):
+    counts = np.zeros(len(edges2) - 1, dtype=np.int64)
+    for block in iter_area_blocks(coords, chunk_size, start, stop):
+        counts += _bin_counts(_valid_areas2(block), edges2)
+    return counts
+
+
+def _count_shard(coords, low: float, high: float, chunk_size: int, start=0, stop=None) -> int:
+    count = 0
+    for block in iter_area_blocks(coords, chunk_size, start, stop):
+        areas2 = _valid_areas2(block)
+        count += int(np.count_nonzero((areas2 >= 2 * low) & (areas2 <= 2 * high)))
+    return count
+
+
+def _run(coords, shard, args: tuple, processes: int, progress: ProgressCallback | None) -> list:
+    if processes > 1:
+        from .parallel import map_shards
+
+        return list(map_shards(coords, shard, args, processes, progress))
+    if progress is None:
+        return [shard(coords, *args)]
+
+    # The serial scan reports progress one outer index at a time.
+    results = []
+    n = len(coords)
+    for start in range(n):
+        results.append(shard(coords, *args, start=start, stop=start + 1))
+        progress(triangles_count(n) - triangles_count(n - start - 1), triangles_count(n))
+    return results
+
+
+def area_histogram(
+    coords,
+    bins: int = 10,
+    limits: tuple[float, float] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+    processes: int = 1,
+    samples: int | None = None,
+    seed: int | None = None,
+) -> AreaHistogram:
+    coords = as_exact_coords(coords)
+    if limits is None:
+        # The largest triangle comes from the hull, so the default range is
+        # known before the scan and every block can be binned directly.
+        largest = max_area_triangle(as_coords(coords))
+        limits = (0.0, triangle_area(coords, largest) if largest is not None else 1.0)
+    edges = np.histogram_bin_edges([], bins, limits)
+
+    if samples is not None:
+        areas2 = _sampled_areas2(coords, samples, seed)
+        hits = _bin_counts(areas2[areas2 > 0], 2 * edges)
+        counts, errors = _estimate(hits, samples, triangles_count(len(coords)))
+        return AreaHistogram(counts, edges, errors)
+
+    shards = _run(coords, _histogram_shard, (2 * edges, chunk_size), processes, progress)
+    return AreaHistogram(np.sum(shards, axis=0, dtype=np.int64), edges)
+
+
+def count_in_range(
+    coords,
+    low: float,
+    high: float,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: ProgressCallback | None = None,
+    processes: int = 1,
+    samples: int | None = None,
+    seed: int | None = None,
+) -> AreaCount:
+    # Non-degenerate triangles with low <= area <= high.
+    coords = as_exact_coords(coords)
+    if samples is not None:
+        areas2 = _sampled_areas2(coords, samples, seed)
+        hits = np.count_nonzero((areas2 > 0) & (areas2 >= 2 * low) & (areas2 <= 2 * high))
+        count, error = _estimate(hits, samples, triangles_count(len(coords)))
+        return AreaCount(float(count), float(error))
+
+    shards = _run(coords, _count_shard, (low, high, chunk_size), processes, progress)
+    return AreaCount(sum(shards))
+
+
+def triangles_in_range(
+    coords, low: float, high: float, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[tuple[float, Triple]]:
+    # Streams (area, triple) for every non-degenerate triangle with
+    # low <= area <= high, block by block.
+    for block in iter_area_blocks(coords, chunk_size):
+        areas2 = block.areas2.ravel()
+        cells = np.flatnonzero(
+            block.valid_mask().ravel() & (areas2 > 0) & (areas2 >= 2 * low) & (areas2 <= 2 * high)
+        )
+        for cell, area2 in zip(cells.tolist(), areas2[cells].tolist()):
+            yield area2 / 2, block.triple(cell)
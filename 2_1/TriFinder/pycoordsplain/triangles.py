@@ -1,198 +1,690 @@
-from .points import Point
+from .geometry import Point, _doubled_area, doubled_signed_area
+from .kernels import as_exact_coords, as_integral_coords, iter_area_blocks, triangles_count, unreachable_area2
+from .points import PointStore
 
 
-from matplotlib.tri import Triangulation
-
 import numpy as np
-import re
+from collections import Counter
+from fractions import Fraction
+from typing import Callable, Iterator
+
+PROGRESS_STEP: int = 1 << 16
+# Bound on the rounding error of a float64 orientation determinant,
+# relative to the magnitudes of its two products (Shewchuk's ccwerrboundA).
+ORIENTATION_ERROR: float = (3 + 16 * 2.0**-53) * 2.0**-53
 
 class Triangle:
+    # One triangle: either standalone, holding its id and points, or a view
+    # of one row of a TriangleBatch. A standalone triangle computes its area
+    # with the scalar exact kernel and builds a batch of one only when
+    # .batch is read, so both kinds read the same way at their own cost.
+    __slots__ = ("_id", "_points", "_area2", "_batch", "row")
+
     def __init__(self, id: str, point1: Point, point2: Point, point3: Point) -> None:
-        self.id: str = id
-        self.point1: Point = point1
-        self.point2: Point = point2
-        self.point3: Point = point3
-        self.valid: bool = self.check_validity()
+        self._id = id
+        self._points: tuple[Point, Point, Point] | None = (point1, point2, point3)
+        self._area2: float | None = None
+        self._batch: TriangleBatch | None = None
+        self.row: int = 0
 
-    def check_validity(self) -> bool:
-        points = [self.point1, self.point2, self.point3]
-        return (points[1].y - points[0].y) * (points[2].x - points[1].x) != (
-            points[2].y - points[1].y
-        ) * (points[1].x - points[0].x)
+    @classmethod
+    def view(cls, batch: "TriangleBatch", row: int) -> "Triangle":
+        triangle = cls.__new__(cls)
+        triangle._points = None
+        triangle._batch = batch
+        triangle.row = row
+        return triangle
+
+    @property
+    def batch(self) -> "TriangleBatch":
+        if self._batch is None:
+            self._batch = TriangleBatch.from_points([self._id], [self._points])
+        return self._batch
+
+    @property
+    def id(self) -> str:
+        return self._id if self._points is not None else self.batch.ids[self.row]
+
+    @property
+    def point1(self) -> Point:
+        return self.points[0]
+
+    @property
+    def point2(self) -> Point:
+        return self.points[1]
+
+    @property
+    def point3(self) -> Point:
+        return self.points[2]
 
     @property
     def points(self) -> tuple[Point, Point, Point]:
-        return (self.point1, self.point2, self.point3)
+        if self._points is not None:
+            return self._points
+        batch, indices = self.batch, self.batch.indices[self.row]
+        return batch.point(indices[0]), batch.point(indices[1]), batch.point(indices[2])
+
+    def _doubled_area(self) -> float:
+        if self._points is None:
+            return float(self.batch.areas[self.row]) * 2
+        if self._area2 is None:
+            self._area2 = abs(float(doubled_signed_area(*self._points)))
+        return self._area2
+
+    @property
+    def valid(self) -> bool:
+        if self._points is None:
+            return bool(self.batch.valid[self.row])
+        return self._doubled_area() != 0
+
+    def check_validity(self) -> bool:
+        return self.valid
 
     @property
     def area(self) -> float:
-        return 0.5 * abs(
-            (
-                self.point1.x * (self.point2.y - self.point3.y)
-                + self.point2.x * (self.point3.y - self.point1.y)
-                + self.point3.x * (self.point1.y - self.point2.y)
-            )
-        )
+        return self._doubled_area() / 2
+
+
+class TriangleBatch:
+    # Struct of arrays over a point table: row r is the triangle ids[r]
+    # whose vertices are rows indices[r] of numbers and coords. Areas and
+    # validity are computed once for the whole batch, when it is built, and
+    # the table is referenced rather than copied.
+    def __init__(self, ids, indices, numbers, coords) -> None:
+        self.ids: list[str] = list(ids)
+        self.indices: np.ndarray = np.asarray(indices, dtype=np.intp).reshape(-1, 3)
+        self.numbers: np.ndarray = np.asarray(numbers)
+        self.coords: np.ndarray = np.asarray(coords).reshape(-1, 2)
+        if len(self.ids) != len(self.indices):
+            raise ValueError(f"Expected {len(self.indices)} ids, got {len(self.ids)}")
 
+        areas2 = doubled_areas(self.coords, self.indices)
+        self.valid: np.ndarray = areas2 != 0
+        self.areas: np.ndarray = np.abs(areas2) / 2
 
-class TrianglesDraw:
-    def __init__(self, axes, color, points_scale: int = 3) -> None:
-        self.triangleCount = 1
-        self.axes = axes
-        self.color = color
-        self.scale: int = points_scale
-        self.list: list[Triangle] = []
-
-        self.draw = None
-        self.annotation = self.axes.annotate(
-            "",
-            xy=(0, 0),
-            xytext=(10, -20),
-            textcoords="offset points",
-            bbox=dict(boxstyle="round", fc="w"),
+    @classmethod
+    def from_points(cls, ids, triples) -> "TriangleBatch":
+        # A batch with its own point table, three rows per triangle.
+        points = [point for triple in triples for point in triple]
+        return cls(
+            ids,
+            np.arange(len(points)).reshape(-1, 3),
+            [point.number for point in points],
+            [(point.x, point.y) for point in points],
         )
-        self.annotation.set_visible(False)
-
-        self.axes.figure.canvas.mpl_connect("motion_notify_event", self.on_hover)
-        self.axes.figure.canvas.mpl_connect("axes_leave_event", self.on_leave)
-
-    def add_triangle(self, triangle: Triangle) -> None:
-        if triangle.id in [triangle.id for triangle in self.list]:
-            raise ValueError(f"A point with {triangle.id} id already exists")
-
-        if triangle.valid:
-            self.list.append(triangle)
-            self.update_draw()
-
-    def add_triangle_with_points(
-        self, id: str, point1: Point, point2: Point, point3: Point
-    ) -> None:
-        triangle = Triangle(id, point1, point2, point3)
-        if triangle.valid:
-            self.list.append(triangle)
-            self.update_draw()
-
-    def remove_triangle_by_id(self, id: str) -> None:
-        for triangle in self.list:
-            if triangle.id == id:
-                self.list.remove(triangle)
-                self.update_draw()
-                break
-
-    def remove_triangles_by_id_pattern(self, id_pattern: str) -> None:
-        self.list = [triangle for triangle in self.list if re.match(id_pattern, triangle.id)]
-        self.update_draw()
-
-    def on_triangle(self, x, y) -> Triangle | None:
-        if not self.list:
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, row: int) -> Triangle:
+        if not -len(self.ids) <= row < len(self.ids):
+            raise IndexError(f"Row {row} is out of range")
+        return Triangle.view(self, row % len(self.ids))
+
+    def __iter__(self) -> Iterator[Triangle]:
+        for row in range(len(self.ids)):
+            yield Triangle.view(self, row)
+
+    @property
+    def vertices(self) -> np.ndarray:
+        # (M, 3, 2) float64 vertex coordinates.
+        return np.asarray(self.coords, dtype=np.float64)[self.indices]
+
+    def point(self, index: int) -> Point:
+        x, y = self.coords[index].tolist()
+        return Point(int(self.numbers[index]), x, y)
+
+
+def doubled_areas(coords, indices: np.ndarray) -> np.ndarray:
+    # Twice the signed area of every row of vertex indices, as float64 with
+    # an exact sign. Integral coordinates go through the exact kernels; float
+    # rows too close to zero for their rounding error are redone exactly.
+    exact = as_exact_coords(coords)
+    first, second, third = (exact[indices[:, column]] for column in range(3))
+    left = (second[:, 0] - first[:, 0]) * (third[:, 1] - first[:, 1])
+    right = (second[:, 1] - first[:, 1]) * (third[:, 0] - first[:, 0])
+    areas2 = left - right
+    if exact.dtype == np.float64:
+        uncertain = np.abs(areas2) <= ORIENTATION_ERROR * (np.abs(left) + np.abs(right))
+        for row in np.flatnonzero(uncertain).tolist():
+            areas2[row] = float(_doubled_area(*exact[indices[row]].ravel().tolist()))
+    return np.asarray(areas2, dtype=np.float64)
+
+
+def segment_distances(px: float, py: float, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    # Distances from (px, py) to each segment starts[i] -> ends[i]; segments
+    # of zero length fall back to the distance to their endpoint.
+    edges = ends - starts
+    offsets = np.array((px, py)) - starts
+    lengths2 = np.einsum("...i,...i->...", edges, edges)
+    projections = np.einsum("...i,...i->...", offsets, edges)
+    t = np.divide(projections, lengths2, out=np.zeros_like(projections), where=lengths2 > 0)
+    np.clip(t, 0, 1, out=t)
+    nearest = offsets - t[..., None] * edges
+    return np.sqrt(np.einsum("...i,...i->...", nearest, nearest))
+
+
+class TriangleIndex:
+    LEAF_SIZE: int = 32
+    # Edges are cut into pieces of about 1 / PIECES of the mean edge length
+    # before packing, so a few long edges of large, overlapping triangles
+    # cannot stretch every leaf box over the whole plot.
+    PIECES: int = 2
+    # Leaves scanned first to get an upper bound on the nearest distance.
+    SEED_LEAVES: int = 8
+
+    def __init__(self, vertices: np.ndarray) -> None:
+        vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3, 2)
+        starts = vertices.reshape(-1, 2)
+        ends = np.roll(vertices, -1, axis=1).reshape(-1, 2)
+        edges = ends - starts
+        lengths = np.hypot(edges[:, 0], edges[:, 1])
+        piece = lengths.mean() / self.PIECES if len(lengths) else 0.0
+        counts = np.ones(len(lengths), dtype=np.int64)
+        if piece > 0:
+            counts = np.maximum(np.ceil(lengths / piece), 1).astype(np.int64)
+        segments = np.repeat(np.arange(len(lengths)), counts)
+        steps = np.arange(len(segments)) - (np.cumsum(counts) - counts)[segments]
+
+        # Sort-tile-recursive packing of the pieces: slice them by centre x,
+        # sort each slice by centre y and cut it into leaves. The last leaf
+        # is padded with copies of its last piece.
+        centers = starts[segments] + ((steps + 0.5) / counts[segments])[:, None] * edges[segments]
+        leaves = -(-len(segments) // self.LEAF_SIZE)
+        slice_size = self.LEAF_SIZE * max(1, int(np.ceil(np.sqrt(leaves))))
+        tiles = np.empty(len(segments), dtype=np.int64)
+        tiles[np.argsort(centers[:, 0])] = np.arange(len(segments)) // slice_size
+        by_y = np.argsort(centers[:, 1])
+        # There are about sqrt(leaves) slices, so the keys fit in 16 bits
+        # and the stable sort is a radix sort.
+        order = by_y[np.argsort(tiles[by_y].astype(np.uint16), kind="stable")]
+        order = np.concatenate((order, np.repeat(order[-1:], leaves * self.LEAF_SIZE - len(order))))
+        segments, steps = segments[order], steps[order]
+
+        # Leaves hold whole edges, so distances are exact; only the boxes
+        # are built from the pieces.
+        shape = (leaves, self.LEAF_SIZE, 2)
+        self.starts: np.ndarray = starts[segments].reshape(shape)
+        self.ends: np.ndarray = ends[segments].reshape(shape)
+        self.rows: np.ndarray = (segments // 3).reshape(shape[:2])
+        # Piece corners are interpolated so that the first and last corners
+        # of an edge are its exact ends.
+        pieces = counts[segments]
+        edge_starts, edge_ends = self.starts.reshape(-1, 2), self.ends.reshape(-1, 2)
+        t = (steps / pieces)[:, None]
+        first = edge_starts * (1 - t) + edge_ends * t
+        t = ((steps + 1) / pieces)[:, None]
+        last = edge_starts * (1 - t) + edge_ends * t
+        low = np.minimum(first, last).reshape(shape).min(axis=1)
+        high = np.maximum(first, last).reshape(shape).max(axis=1)
+        self.boxes: np.ndarray = np.concatenate((low, high), axis=1)
+        self.alive: np.ndarray = np.ones(len(vertices), dtype=bool)
+        self.discarded: int = 0
+
+    def __len__(self) -> int:
+        return len(self.alive)
+
+    def discard(self, row: int) -> None:
+        # Drops input row from later queries without repacking.
+        if self.alive[row]:
+            self.alive[row] = False
+            self.discarded += 1
+
+    def nearest(self, x: float, y: float) -> tuple[int, float] | None:
+        if not len(self.rows):
+            return None
+
+        # A bounding box distance is a lower bound for the distance to any
+        # edge inside it. The nearest few boxes give an upper bound, and all
+        # leaves whose box is within it are then scanned in one pass.
+        gap_x = np.maximum(np.maximum(self.boxes[:, 0] - x, x - self.boxes[:, 2]), 0)
+        gap_y = np.maximum(np.maximum(self.boxes[:, 1] - y, y - self.boxes[:, 3]), 0)
+        box_distances = np.hypot(gap_x, gap_y)
+        seeds = min(self.SEED_LEAVES, len(box_distances))
+        best = self._scan(x, y, np.argpartition(box_distances, seeds - 1)[:seeds])
+        nearer = np.flatnonzero(box_distances < best[1])
+        if len(nearer):
+            found = self._scan(x, y, nearer)
+            if found[1] < best[1]:
+                best = found
+        if best[0] < 0:
             return None
+        return best
+
+    def _scan(self, x: float, y: float, leaves: np.ndarray) -> tuple[int, float]:
+        distances = segment_distances(x, y, self.starts[leaves], self.ends[leaves])
+        rows = self.rows[leaves]
+        distances[~self.alive[rows]] = np.inf
+        best = np.unravel_index(np.argmin(distances), distances.shape)
+        if distances[best] == np.inf:
+            return -1, np.inf
+        return int(rows[best]), float(distances[best])
+
+
+def _sorted_directions(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    # Directions all lie in the half-plane dx > 0 or (dx == 0, dy > 0), so the
+    # angle is monotone in the slope. Equal reduced directions give equal
+    # floats and stay grouped; distinct directions closer than the rounding
+    # error are caught by the exact cross product check and sorted exactly.
+    order = np.argsort(np.arctan2(dy, dx), kind="stable")
+    sx, sy = dx[order], dy[order]
+    crosses = sx[:-1] * sy[1:] - sy[:-1] * sx[1:]
+    same = (sx[:-1] == sx[1:]) & (sy[:-1] == sy[1:])
+    if (same | (crosses > 0)).all():
+        return order
+
+    def slope(index: int):
+        x, y = int(dx[index]), int(dy[index])
+        return (1, 0) if x == 0 else (0, Fraction(y, x))
+
+    keys = sorted(range(len(dx)), key=lambda index: (slope(index), int(dx[index]), int(dy[index])))
+    return np.array(keys, dtype=np.int64)
+
+
+def _sweep_pair(
+    order: list[int], position: list[int], xs: list[int], ys: list[int], a: int, b: int
+) -> tuple[float, tuple[int, int, int] | None]:
+    # Swaps two adjacent points that are alone on their line and returns the
+    # smallest triangle they form with the points on either side.
+    low = position[a]
+    other = position[b]
+    if other < low:
+        low = other
+    a = order[low]
+    b = order[low + 1]
+    xa = xs[a]
+    ya = ys[a]
+    ex = xs[b] - xa
+    ey = ys[b] - ya
+
+    best_area2 = float("inf")
+    best: tuple[int, int, int] | None = None
+    if low:
+        c = order[low - 1]
+        best_area2 = abs(ex * (ys[c] - ya) - ey * (xs[c] - xa))
+        best = (a, b, c)
+    if low + 2 < len(order):
+        c = order[low + 2]
+        area2 = abs(ex * (ys[c] - ya) - ey * (xs[c] - xa))
+        if area2 < best_area2:
+            best_area2 = area2
+            best = (a, b, c)
+
+    order[low] = b
+    order[low + 1] = a
+    position[a] = low + 1
+    position[b] = low
+    return best_area2, best
 
-        return min(
-            self.list,
-            key=lambda t: self.distance_to_triangle(
-                x,
-                y,
-                t.point1.x,
-                t.point1.y,
-                t.point2.x,
-                t.point2.y,
-                t.point3.x,
-                t.point3.y,
-            ),
-            default=None,
+
+def _sweep_line(
+    order: list[int], position: list[int], xs: list[int], ys: list[int], points: set[int]
+) -> tuple[float, tuple[int, int, int] | None]:
+    # Reverses the contiguous run of three or more collinear points and
+    # returns the smallest triangle between consecutive run points and the
+    # points adjacent to the run.
+    positions = sorted(position[point] for point in points)
+    low, high = positions[0], positions[-1]
+    line = [order[index] for index in positions]
+
+    best_area2 = float("inf")
+    best: tuple[int, int, int] | None = None
+    for neighbour in (low - 1, high + 1):
+        if not 0 <= neighbour < len(order):
+            continue
+        c = order[neighbour]
+        for a, b in zip(line, line[1:]):
+            area2 = abs((xs[b] - xs[a]) * (ys[c] - ys[a]) - (ys[b] - ys[a]) * (xs[c] - xs[a]))
+            if area2 < best_area2:
+                best_area2 = area2
+                best = (a, b, c)
+
+    for index, point in zip(range(low, high + 1), reversed(line)):
+        order[index] = point
+        position[point] = index
+    return best_area2, best
+
+
+def min_area_triangle(
+    coords, progress: Callable[[int, int], None] | None = None
+) -> tuple[int, int, int] | None:
+    integral = as_integral_coords(coords)
+    if integral is None:
+        raise ValueError("min_area_triangle needs integral coordinates below 2**30")
+
+    # Duplicates only form degenerate triangles; np.unique also sorts the
+    # points by (x, y), which is the sweep order just past the vertical.
+    unique, originals = np.unique(integral.reshape(-1, 2), axis=0, return_index=True)
+    n = len(unique)
+    if n < 3:
+        return None
+
+    first, second = (indices.astype(np.int32) for indices in np.triu_indices(n, 1))
+    dx = unique[second, 0] - unique[first, 0]
+    dy = unique[second, 1] - unique[first, 1]
+    divisor = np.gcd(dx, dy)
+    dx //= divisor
+    dy //= divisor
+    del divisor
+    by_angle = _sorted_directions(dx, dy)
+    first, second, dx, dy = first[by_angle], second[by_angle], dx[by_angle], dy[by_angle]
+    del by_angle
+
+    pairs = len(first)
+    starts = np.ones(pairs + 1, dtype=bool)
+    starts[1:pairs] = (dx[1:] != dx[:-1]) | (dy[1:] != dy[:-1])
+    group_starts = np.flatnonzero(starts)
+
+    xs, ys = unique[:, 0].tolist(), unique[:, 1].tolist()
+    order = list(range(n))
+    position = list(range(n))
+    best_area2 = float("inf")
+    best: tuple[int, int, int] | None = None
+    pending: list[tuple[int, int]] = []
+
+    # Rotating sweep over the dual arrangement: points stay ordered by their
+    # offset across a line whose direction turns through every pair direction.
+    # When it reaches the direction of a collinear run, the run is contiguous
+    # and the nearest point off that line is adjacent to one of its ends.
+    chunk_start = 0
+    while chunk_start < pairs:
+        chunk_end = pairs
+        if chunk_start + PROGRESS_STEP < pairs:
+            # Chunks end on a group boundary so no direction spans two chunks.
+            boundary = np.searchsorted(group_starts, chunk_start + PROGRESS_STEP)
+            chunk_end = int(group_starts[boundary])
+        chunk = zip(
+            first[chunk_start:chunk_end].tolist(),
+            second[chunk_start:chunk_end].tolist(),
+            (starts[chunk_start:chunk_end] & starts[chunk_start + 1 : chunk_end + 1]).tolist(),
+            starts[chunk_start + 1 : chunk_end + 1].tolist(),
+            range(chunk_start, chunk_end),
         )
+        for a, b, single, group_ends, pair in chunk:
+            if single:
+                area2, triple = _sweep_pair(order, position, xs, ys, a, b)
+                if area2 < best_area2:
+                    best_area2 = area2
+                    best = triple
+                continue
+
+            pending.append((a, b))
+            if not group_ends:
+                continue
+            # Parallel lines share a direction; their runs are disjoint, so
+            # each can be swept on its own.
+            rx, ry = int(dx[pair]), int(dy[pair])
+            lines: dict[int, list[tuple[int, int]]] = {}
+            for a, b in pending:
+                lines.setdefault(rx * ys[a] - ry * xs[a], []).append((a, b))
+            pending.clear()
+            for line_pairs in lines.values():
+                if len(line_pairs) == 1:
+                    area2, triple = _sweep_pair(order, position, xs, ys, *line_pairs[0])
+                else:
+                    points = {point for line_pair in line_pairs for point in line_pair}
+                    area2, triple = _sweep_line(order, position, xs, ys, points)
+                if area2 < best_area2:
+                    best_area2 = area2
+                    best = triple
+
+        chunk_start = chunk_end
+        if progress is not None:
+            progress(chunk_end, pairs)
+
+    if best is None:
+        return None
+    return tuple(sorted(int(originals[index]) for index in best))  # type: ignore
+
 
-    def update_draw(self) -> None:
-        if not self.list:
-            if hasattr(self, "draw_lines") and hasattr(self, "draw_markers"):
-                for line in self.draw_lines.get_children():
-                    line.remove()
-                for marker in self.draw_markers.get_children():
-                    marker.remove()
+class IncrementalMinMax:
+    # Keeps the min and max triangles of a changing point set. Every point
+    # remembers the smallest and largest triangles it belongs to, stored as
+    # the numbers of the two other vertices, so adding a point only scans the
+    # triangles through it and removing one only rescans the points whose
+    # best triangles used it.
+    CHUNK_SIZE: int = 1 << 16
 
-            self.axes.figure.canvas.flush_events()
-            self.axes.figure.canvas.draw_idle()
+    def __init__(self) -> None:
+        self.store: PointStore = PointStore()
+        self._min_area2 = np.empty(0, dtype=np.float64)
+        self._min_partners = np.empty((0, 2), dtype=np.int64)
+        self._max_area2 = np.empty(0, dtype=np.float64)
+        self._max_partners = np.empty((0, 2), dtype=np.int64)
 
-            # Установка self.draw в None
-            self.draw = None
+    def __len__(self) -> int:
+        return len(self.store)
 
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= len(self._min_area2):
             return
+        capacity = max(capacity, 2 * len(self._min_area2), 64)
+        for name in ("_min_area2", "_min_partners", "_max_area2", "_max_partners"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
 
-        combined_x = np.concatenate(
-            [[tri.point1.x, tri.point2.x, tri.point3.x] for tri in self.list]
-        )
-        combined_y = np.concatenate(
-            [[tri.point1.y, tri.point2.y, tri.point3.y] for tri in self.list]
+    def _reset_rows(self, start: int, stop: int) -> None:
+        self._min_area2[start:stop] = np.inf
+        self._max_area2[start:stop] = 0.0
+
+    def _offer(self, rows, values, first, second, smallest: bool) -> None:
+        # Record triangles (rows, first, second) for the points in rows where
+        # they beat the current best; first and second are store rows.
+        rows = np.atleast_1d(rows)
+        areas2, partners = (
+            (self._min_area2, self._min_partners) if smallest else (self._max_area2, self._max_partners)
         )
-        # print(combined_x)
-        # print(combined_y)
-        if self.draw is None:
-            combined_triangles = list(np.arange(len(combined_x)).reshape(-1, 3))
-
-            combined_triangulation = Triangulation(combined_x, combined_y, combined_triangles)
-            self.draw_lines, self.draw_markers = self.axes.triplot(
-                combined_triangulation,
-                marker="o",
-                markersize=self.scale,
-                linestyle="-",
-                c=self.color,
+        better = values < areas2[rows] if smallest else values > areas2[rows]
+        if not better.any():
+            return
+        numbers = self.store.numbers
+        rows = rows[better]
+        areas2[rows] = values[better]
+        partners[rows, 0] = numbers[np.broadcast_to(first, better.shape)[better]]
+        partners[rows, 1] = numbers[np.broadcast_to(second, better.shape)[better]]
+
+    def _scan_point(self, row: int, offer_others: bool) -> None:
+        # All triangles through row, as an n x n matrix over the other two
+        # vertices. Row-wise reductions give each other point's best triangle
+        # through row; the overall reductions give row's own best. The
+        # kernel and sentinel match rebuild, so both agree on every area.
+        coords = as_exact_coords(self.store.coords)
+        dx = coords[:, 0] - coords[row, 0]
+        dy = coords[:, 1] - coords[row, 1]
+        n = len(dx)
+        rows_per_block = max(1, self.CHUNK_SIZE // n)
+
+        self._reset_rows(row, row + 1)
+        for start in range(0, n, rows_per_block):
+            stop = min(start + rows_per_block, n)
+            block_rows = np.arange(start, stop)
+            areas2 = dx[start:stop, None] * dy[None, :]
+            areas2 -= dy[start:stop, None] * dx[None, :]
+            np.abs(areas2, out=areas2)
+            unreachable = unreachable_area2(areas2)
+
+            for smallest in (False, True):
+                if smallest:
+                    # Zero areas are degenerate, including self and row itself.
+                    areas2[areas2 == 0] = unreachable
+                columns = np.argmin(areas2, axis=1) if smallest else np.argmax(areas2, axis=1)
+                values = areas2[block_rows - start, columns]
+                values = np.where(values == unreachable, np.inf, values)
+                if offer_others:
+                    others = block_rows != row
+                    self._offer(block_rows[others], values[others], row, columns[others], smallest)
+                best = int(np.argmin(values) if smallest else np.argmax(values))
+                self._offer(
+                    np.array([row]), values[best : best + 1], block_rows[best], columns[best : best + 1], smallest
+                )
+
+    def rebuild(self, progress: Callable[[int, int], None] | None = None) -> None:
+        # One pass over every triple i < j < k: block, row and column
+        # reductions give the best triangle through i, each j and each k.
+        size = len(self.store)
+        self._reset_rows(0, size)
+        total = triangles_count(size)
+        done = 0
+        for block in iter_area_blocks(self.store.coords, self.CHUNK_SIZE):
+            areas2 = block.areas2
+            rows, columns = areas2.shape
+            j = np.arange(block.j_start, block.j_start + rows)
+            k = np.arange(block.j_start + 1, block.j_start + 1 + columns)
+            unreachable = unreachable_area2(areas2)
+
+            for smallest in (False, True):
+                if smallest:
+                    areas2[areas2 == 0] = unreachable
+                reduce = np.argmin if smallest else np.argmax
+                by_row = reduce(areas2, axis=1)
+                by_column = reduce(areas2, axis=0)
+                # Integral input gives int64 blocks; the candidate arrays
+                # hold floats with inf for "no triangle".
+                row_values = areas2[np.arange(rows), by_row]
+                row_values = np.where(row_values == unreachable, np.inf, row_values)
+                column_values = areas2[by_column, np.arange(columns)]
+                column_values = np.where(column_values == unreachable, np.inf, column_values)
+
+                self._offer(j, row_values, block.i, k[by_row], smallest)
+                row = int(reduce(row_values))
+                self._offer(np.array([block.i]), row_values[row : row + 1], j[row], k[by_row[row : row + 1]], smallest)
+                self._offer(k, column_values, block.i, j[by_column], smallest)
+
+            if progress is not None:
+                done += block.valid_count()
+                progress(done, total)
+
+    def add(self, number: int, x: float, y: float) -> None:
+        self.store.add(number, x, y)
+        self._reserve(len(self.store))
+        self._scan_point(len(self.store) - 1, offer_others=True)
+
+    def remove(self, number: int) -> None:
+        valid = np.concatenate(
+            (
+                self._min_area2[: len(self.store)] < np.inf,
+                self._max_area2[: len(self.store)] > 0.0,
             )
-        else:
-            pass
-
-    def on_hover(self, event) -> None:
-        if (
-            event.inaxes is not None
-            and event.xdata is not None
-            and event.ydata is not None
-        ):
-            triangle = self.on_triangle(event.xdata, event.ydata)
-            if triangle:
-                self.update_annotation(triangle)
-                self.annotation.set_visible(True)
-                self.axes.figure.canvas.draw_idle()
-            else:
-                self.annotation.set_visible(False)
-                self.axes.figure.canvas.draw_idle()
-
-    def on_leave(self, event) -> None:
-        self.annotation.set_visible(False)
-        self.axes.figure.canvas.draw_idle()
-
-    def update_annotation(self, triangle):
-        triangle_points = [triangle.point1, triangle.point2, triangle.point3]
-        self.annotation.xy = (
-            min(point.x for point in triangle_points),
-            min(point.y for point in triangle_points),
-        )
-        self.annotation.set_text(
-            f"Triangle {triangle.id} area: {triangle.area}\nP{triangle.point1.number}[{triangle.point1.x:.0f}, {triangle.point1.y:.0f}], P{triangle.point2.number}[{triangle.point2.x:.0f}, {triangle.point2.y:.0f}], P{triangle.point3.number}[{triangle.point3.x:.0f}, {triangle.point3.y:.0f}]"
         )
-        self.axes.figure.canvas.draw_idle()
-
-    @staticmethod
-    def point_in_triangle(px, py, x1, y1, x2, y2, x3, y3) -> bool:
-        d1 = TrianglesDraw.sign(px, py, x1, y1, x2, y2)
-        d2 = TrianglesDraw.sign(px, py, x2, y2, x3, y3)
-        d3 = TrianglesDraw.sign(px, py, x3, y3, x1, y1)
-        has_neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
-        has_pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
-        return not (has_neg and has_pos)
-
-    @staticmethod
-    def sign(px, py, x1, y1, x2, y2) -> float:
-        return (px - x2) * (y1 - y2) - (x1 - x2) * (py - y2)
-
-    @staticmethod
-    def distance_to_triangle(px, py, x1, y1, x2, y2, x3, y3) -> float:
-        return min(
-            TrianglesDraw.point_to_line_distance(px, py, x1, y1, x2, y2),
-            TrianglesDraw.point_to_line_distance(px, py, x2, y2, x3, y3),
-            TrianglesDraw.point_to_line_distance(px, py, x3, y3, x1, y1),
+        partners = np.concatenate((self.min_partners, self.max_partners))
+        stale = valid & (partners == number).any(axis=1)
+        affected = set(self.store.numbers[np.flatnonzero(stale) % len(self.store)].tolist())
+        affected.discard(number)
+
+        row = self.store.remove(number)
+        last = len(self.store)
+        if row != last:
+            for array in (self._min_area2, self._min_partners, self._max_area2, self._max_partners):
+                array[row] = array[last]
+        for other in affected:
+            self._scan_point(self.store.row_of(other), offer_others=False)  # type: ignore
+
+    def extend(self, numbers, coords, progress: Callable[[int, int], None] | None = None) -> None:
+        numbers = np.asarray(numbers, dtype=np.int64)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        start = len(self.store)
+        self.store.extend(numbers, coords)
+        self._reserve(len(self.store))
+        self._reset_rows(start, len(self.store))
+        # Each added point costs a scan of all pairs; past a quarter of the
+        # set a single pass over all triples is cheaper.
+        if 4 * len(numbers) > len(self.store):
+            try:
+                self.rebuild(progress)
+            except BaseException:
+                # A progress callback may abort the pass; half-built
+                # candidates are worthless, so start over next time.
+                self.clear()
+                raise
+            return
+        for row in range(start, len(self.store)):
+            self._scan_point(row, offer_others=True)
+
+    def sync(self, numbers, coords, progress: Callable[[int, int], None] | None = None) -> None:
+        # Brings the engine to exactly the given points; a moved point is
+        # removed and added again.
+        numbers = np.asarray(numbers, dtype=np.int64)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        current = dict(zip(self.store.numbers.tolist(), map(tuple, self.store.coords.tolist())))
+        wanted = dict(zip(numbers.tolist(), map(tuple, coords.tolist())))
+        removed = [number for number, point in current.items() if wanted.get(number) != point]
+        added = [row for row, number in enumerate(numbers.tolist()) if wanted[number] != current.get(number)]
+        self._apply(removed, numbers[added], coords[added], numbers, coords, progress)
+
+    def sync_coords(self, coords, progress: Callable[[int, int], None] | None = None) -> None:
+        # Like sync, but matches points by position, so renumbering, e.g.
+        # by a point inserted in the middle of a file, changes nothing. New
+        # points get numbers past the engine's own; results map back to the
+        # caller's rows through store coordinates.
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2) + 0.0
+        wanted = Counter(map(tuple, coords.tolist()))
+        removed = []
+        for number, point in zip(self.store.numbers.tolist(), map(tuple, (self.store.coords + 0.0).tolist())):
+            if wanted[point] > 0:
+                wanted[point] -= 1
+            else:
+                removed.append(number)
+        added = np.array(list(wanted.elements()), dtype=np.float64).reshape(-1, 2)
+        start = int(self.store.numbers.max()) + 1 if len(self.store) else 0
+        self._apply(
+            removed, np.arange(start, start + len(added)), added, np.arange(len(coords)), coords, progress
         )
 
-    @staticmethod
-    def point_to_line_distance(px, py, x1, y1, x2, y2) -> float:
-        num = np.abs((x2 - x1) * (y1 - py) - (x1 - px) * (y2 - y1))
-        den = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        return num / den
\ No newline at end of file
+    def _apply(self, removed, numbers, coords, all_numbers, all_coords, progress) -> None:
+        # Past a quarter of the set changing, starting over is cheaper than
+        # rescanning every point that lost a candidate.
+        if 4 * len(removed) > len(self.store):
+            self.clear()
+            self.extend(all_numbers, all_coords, progress)
+            return
+        for number in removed:
+            self.remove(number)
+        self.extend(numbers, coords, progress)
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    @property
+    def min_partners(self) -> np.ndarray:
+        return self._min_partners[: len(self.store)]
+
+    @property
+    def max_partners(self) -> np.ndarray:
+        return self._max_partners[: len(self.store)]
+
+    def _best(self, smallest: bool) -> tuple[float, tuple[int, int, int]] | None:
+        size = len(self.store)
+        if not size:
+            return None
+        areas2 = self._min_area2[:size] if smallest else self._max_area2[:size]
+        row = int(np.argmin(areas2) if smallest else np.argmax(areas2))
+        if not 0.0 < areas2[row] < np.inf:
+            return None
+        partners = self.min_partners if smallest else self.max_partners
+        triple = (int(self.store.numbers[row]), *partners[row].tolist())
+        return 0.5 * float(areas2[row]), tuple(sorted(triple))  # type: ignore
+
+    @property
+    def min_area(self) -> float:
+        best = self._best(True)
+        return 0.0 if best is None else best[0]
+
+    @property
+    def max_area(self) -> float:
+        best = self._best(False)
+        return 0.0 if best is None else best[0]
+
+    @property
+    def min_numbers(self) -> tuple[int, int, int] | None:
+        best = self._best(True)
+        return None if best is None else best[1]
+
+    @property
+    def max_numbers(self) -> tuple[int, int, int] | None:
+        best = self._best(False)
+        return None if best is None else best[1]
+
+    def triangle(self, id: str, numbers: tuple[int, int, int]) -> Triangle:
+        return Triangle(id, *(self.store.get(number) for number in numbers))  # type: ignore
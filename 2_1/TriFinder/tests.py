@@ -1,14 +1,60 @@
 import unittest
-import time
+import contextlib
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import weakref
+from fractions import Fraction
+from itertools import combinations
+from unittest import mock
 
-from pycoordsplain.points import Point
-from pycoordsplain.triangles import Triangle
+import numpy as np
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
-
-class Item:
-    def __init__(self, id) -> None:
-        self.id = id
-        pass
+from pycoordsplain.jobs import SearchJob
+from pycoordsplain.drawing import PointsDraw, TrianglesDraw
+from pycoordsplain.geometry import Point, PointPool, doubled_signed_area
+from pycoordsplain.points import GridIndex, PointStore
+from pycoordsplain.triangles import (
+    IncrementalMinMax,
+    Triangle,
+    TriangleBatch,
+    TriangleIndex,
+    min_area_triangle,
+    segment_distances,
+)
+from pycoordsplain.search import (
+    SWEEP_MIN_POINTS,
+    as_exact_coords,
+    brute_force_min_max,
+    min_max_triangle,
+    top_k_triangles,
+    triangle_area,
+    use_sweep,
+)
+from pycoordsplain.hull import convex_hull, max_area_triangle
+from pycoordsplain.parallel import parallel_min_max, shard_bounds
+from pycoordsplain.preprocess import preprocess
+from pycoordsplain.stats import area_histogram, count_in_range, triangles_in_range
+from pycoordsplain.blit import blit_manager, hover_controller
+from pycoordsplain.cache import ResultCache, decode_min_max, encode_min_max
+from pycoordsplain.cli import main as cli_main
+from pycoordsplain.pointfile import (
+    convert_text_to_binary,
+    is_binary_point_file,
+    iter_point_chunks,
+    open_binary_points,
+    UniqueFilter,
+    read_points,
+    unique_rows,
+    write_binary_points,
+)
 
 
 class TriangleTestCase(unittest.TestCase):
@@ -16,74 +62,903 @@ class TriangleTestCase(unittest.TestCase):
         triangle = Triangle(
             "test1", Point(0, x=0, y=0), Point(1, x=0, y=1), Point(2, x=1, y=0)
         )
-        if triangle.area == 0.5: print("Area1 passed")
+        self.assertEqual(triangle.area, 0.5)
 
     def testTriangleArea2(self):
         triangle = Triangle(
             "test1", Point(0, x=1, y=5), Point(1, x=4, y=6), Point(2, x=0, y=7)
         )
-        if triangle.area == 0.5: print("Area2 passed")
+        self.assertEqual(triangle.area, 3.5)
 
     def testTriangleArea3(self):
         triangle = Triangle(
             "test1", Point(0, x=34, y=26), Point(1, x=34, y=25), Point(2, x=35, y=25)
         )
-        if triangle.area == 0.5: print("Area3 passed")
+        self.assertEqual(triangle.area, 0.5)
 
 
-class RemoveListItemTestCaseGeneratingNewList1(unittest.TestCase):
-    def setUp(self):
-        self.startTime = time.time()
+class TriangleBatchTestCase(unittest.TestCase):
+    def testColumnsMatchExactAreas(self):
+        rng = np.random.default_rng(22)
+        coords = np.concatenate((rng.integers(0, 5, size=(20, 2)), rng.random((20, 2)) * 4))
+        coords[30:] = coords[:10] / 3 + 0.1
+        indices = rng.integers(0, len(coords), size=(500, 3))
+        batch = TriangleBatch([str(row) for row in range(500)], indices, np.arange(40), coords)
+        for row, triangle in enumerate(batch):
+            points = [Point(number, *coords[number].tolist()) for number in indices[row].tolist()]
+            exact = abs(Fraction(doubled_signed_area(*points))) / 2
+            self.assertEqual(triangle.valid, exact != 0)
+            self.assertAlmostEqual(triangle.area, float(exact))
+            self.assertEqual(triangle.point2.number, indices[row, 1])
+
+    def testTriangleIsABatchOfOne(self):
+        triangle = Triangle("t", Point(7, 0, 0), Point(8, 4, 0), Point(9, 0, 3))
+        self.assertEqual((triangle.id, triangle.area, triangle.valid), ("t", 6.0, True))
+        self.assertEqual([point.number for point in triangle.points], [7, 8, 9])
+        self.assertEqual(len(triangle.batch), 1)
+        self.assertFalse(hasattr(triangle, "__dict__"))
+
+    def testStandaloneMatchesBatchRow(self):
+        rng = np.random.default_rng(8)
+        for coords in (rng.random((3, 2)) * 1e6, rng.integers(-(2**40), 2**40, size=(3, 2)), [(0, 0), (0.1, 0.1), (0.3, 0.3)]):
+            points = [Point(number, *point) for number, point in enumerate(np.asarray(coords).tolist())]
+            standalone = Triangle("t", *points)
+            row = TriangleBatch.from_points(["t"], [points])[0]
+            # Batches round float determinants once; the scalar kernel is exact.
+            self.assertAlmostEqual(standalone.area, row.area, delta=1e-12 * row.area)
+            self.assertEqual(standalone.valid, row.valid)
+            self.assertEqual(standalone.points, row.points)
+
+    def testDrawAddsValidRows(self):
+        batch = TriangleBatch(
+            ["a", "flat", "b"], [(0, 1, 2), (0, 1, 3), (1, 2, 3)], [1, 2, 3, 4], [(0, 0), (2, 0), (0, 2), (4, 0)]
+        )
+        triangles = TrianglesDraw(Figure().add_subplot(), "k")
+        triangles.add_triangles(batch)
+        self.assertEqual(triangles.ids, ["a", "b"])
+        self.assertEqual(triangles.numbers[1].tolist(), [2, 3, 4])
+        self.assertEqual(triangles.on_triangle(0.5, 0.5).area, 2.0)
+        with self.assertRaises(ValueError):
+            triangles.add_triangles(TriangleBatch(["c", "b"], [(0, 1, 2), (0, 1, 2)], [1, 2, 3], [(0, 0), (1, 0), (0, 1)]))
+        self.assertEqual(triangles.ids, ["a", "b"])
+        self.assertEqual(triangles.batch.areas.tolist(), [2.0, 2.0])
+
+
+def brute_force_areas(coords) -> list[float]:
+    points = [Point(number, x, y) for number, (x, y) in enumerate(coords)]
+    triangles = [Triangle("test", *combo) for combo in combinations(points, 3)]
+    return [triangle.area for triangle in triangles if triangle.valid]
+
+
+class MinMaxTriangleTestCase(unittest.TestCase):
+    def testMatchesBruteForce(self):
+        rng = np.random.default_rng(1)
+        for n in (3, 4, 17, 40):
+            coords = rng.integers(0, 12, size=(n, 2)).astype(float)
+            areas = brute_force_areas(coords)
+            result = min_max_triangle(coords, chunk_size=64)
+            self.assertEqual(result.min_area, min(areas))
+            self.assertEqual(result.max_area, max(areas))
+            self.assertEqual(triangle_area(coords, result.min_triple), result.min_area)
+            self.assertEqual(triangle_area(coords, result.max_triple), result.max_area)
+
+    def testCollinearPoints(self):
+        coords = np.array([(0, 0), (1, 1), (2, 2), (5, 5)], dtype=float)
+        result = min_max_triangle(coords)
+        self.assertIsNone(result.min_triple)
+        self.assertIsNone(result.max_triple)
+
+
+class ConvexHullTestCase(unittest.TestCase):
+    def testSquareWithInteriorPoints(self):
+        coords = np.array([(0, 0), (4, 0), (2, 2), (4, 4), (2, 0), (0, 4), (1, 3)], dtype=float)
+        self.assertEqual(sorted(convex_hull(coords).tolist()), [0, 1, 3, 5])
+
+    def testMaxAreaMatchesBruteForce(self):
+        rng = np.random.default_rng(2)
+        for _ in range(200):
+            coords = rng.integers(0, rng.integers(2, 20), size=(rng.integers(1, 30), 2)).astype(float)
+            _, (max_area2, max_triple) = brute_force_min_max(coords)
+            triple = max_area_triangle(coords)
+            if max_triple is None:
+                self.assertIsNone(triple)
+            else:
+                self.assertEqual(2 * triangle_area(coords, triple), max_area2)
+
+
+class MinAreaTriangleTestCase(unittest.TestCase):
+    def testRandomizedCrossCheck(self):
+        rng = np.random.default_rng(3)
+        for _ in range(300):
+            # Small grids give many duplicates and collinear runs.
+            size = int(rng.integers(2, 12))
+            coords = rng.integers(-size, size, size=(rng.integers(1, 40), 2))
+            (min_area2, min_triple), _ = brute_force_min_max(coords)
+            triple = min_area_triangle(coords)
+            if min_triple is None:
+                self.assertIsNone(triple)
+            else:
+                self.assertEqual(2 * triangle_area(coords, triple), min_area2)
+
+    def testRejectsFractionalCoordinates(self):
+        with self.assertRaises(ValueError):
+            min_area_triangle(np.array([(0, 0), (1, 0.5), (2, 3)]))
+
+
+class ExactArithmeticTestCase(unittest.TestCase):
+    # Nearly collinear at 2**40: the doubled areas differ from the products
+    # by less than one float64 ulp.
+    BIG = 1 << 40
+    COORDS = [(0, 0), (BIG, BIG + 1), (2 * BIG, 2 * BIG + 1), (3 * BIG, 3 * BIG + 3)]
+
+    def testTriangleUsesExactArea(self):
+        points = [Point(number, float(x), float(y)) for number, (x, y) in enumerate(self.COORDS[:3])]
+        triangle = Triangle("t", *points)
+        self.assertTrue(triangle.valid)
+        self.assertEqual(triangle.area, self.BIG / 2)
+        self.assertFalse(Triangle("t", Point(1, 0, 0), Point(2, 0.5, 0.5), Point(3, 1, 1)).valid)
+
+    def testEngineFallsBackToPythonInts(self):
+        result = min_max_triangle(self.COORDS)
+        self.assertEqual(result.min_triple, (0, 1, 2))
+        self.assertEqual(result.min_area, self.BIG / 2)
+        (min_area2, _), (max_area2, _) = brute_force_min_max(self.COORDS)
+        self.assertEqual((min_area2, max_area2), (self.BIG, 3 * self.BIG))
+
+    def testIntegralInputComparesIntegers(self):
+        (min_area2, _), (max_area2, _) = brute_force_min_max(np.array([(0.0, 0.0), (4.0, 0.0), (0.0, 3.0), (1.0, 1.0)]))
+        self.assertIsInstance(min_area2, int)
+        self.assertEqual((min_area2, max_area2), (3, 12))
+
+    def testDistanceToCoincidentPoints(self):
+        self.assertEqual(TrianglesDraw.point_to_line_distance(3, 4, 0, 0, 0, 0), 5.0)
+
+
+class PreprocessTestCase(unittest.TestCase):
+    def testCountsCollinearTriples(self):
+        rng = np.random.default_rng(24)
+        for scale in (1, 1 << 27):
+            for _ in range(20):
+                coords = rng.integers(-4, 5, size=(rng.integers(1, 40), 2)) * scale
+                prepared = preprocess(coords)
+                unique = prepared.coords.astype(np.int64).tolist()
+                self.assertEqual(len(unique), len({tuple(point) for point in coords.tolist()}))
+                self.assertEqual(prepared.stats.duplicates, len(coords) - len(unique))
+                degenerate = [
+                    combo for combo in combinations(unique, 3)
+                    if (combo[1][0] - combo[0][0]) * (combo[2][1] - combo[0][1])
+                    == (combo[1][1] - combo[0][1]) * (combo[2][0] - combo[0][0])
+                ]
+                self.assertEqual(prepared.stats.collinear_triples, len(degenerate))
+
+    def testReportsLongestLine(self):
+        coords = [(0, 0), (1, 1), (2, 0), (-2, -2), (4, 0), (0, 3), (3, 3)]
+        prepared = preprocess(coords + [(2, 0)])
+        self.assertEqual(prepared.rows.tolist(), list(range(7)))
+        self.assertEqual(prepared.stats.longest_line, 4)
+
+    def testSkipsCollinearPassForFloats(self):
+        stats = preprocess([(0.5, 0), (1, 1), (0.5, 0), (2, 2)]).stats
+        self.assertEqual(stats, (4, 1, None, None))
+
+
+class TopKTrianglesTestCase(unittest.TestCase):
+    def testMatchesSortedAreas(self):
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            coords = rng.integers(0, 6, size=(rng.integers(3, 25), 2))
+            areas = sorted(brute_force_areas(coords))
+            k = int(rng.integers(1, 8))
+            smallest, largest = top_k_triangles(coords, k, chunk_size=16)
+            self.assertEqual([area for area, _ in smallest], areas[:k])
+            self.assertEqual([area for area, _ in largest], areas[::-1][:k])
+            for area, triple in smallest + largest:
+                self.assertEqual(triangle_area(coords, triple), area)
 
-    def tearDown(self):
-        t = time.time() - self.startTime
-        print("%s: %.3f" % (self.id(), t))
+    def testRejectsNonPositiveK(self):
+        with self.assertRaises(ValueError):
+            top_k_triangles([(0, 0), (1, 0), (0, 1)], 0)
 
-    def testListRemovingById(self):
-        _list = [Item(id) for id in range(10_000_000)]
-        _list = [triangle for triangle in _list if triangle.id != id]
 
-class RemoveListItemTestCaseGeneratingNewList2(unittest.TestCase):
+class AreaStatsTestCase(unittest.TestCase):
     def setUp(self):
-        self.startTime = time.time()
+        self.coords = np.random.default_rng(8).integers(0, 10, size=(40, 2))
+        self.areas = np.array(brute_force_areas(self.coords))
+
+    def testHistogramMatchesNumpy(self):
+        histogram = area_histogram(self.coords, bins=7, chunk_size=64)
+        expected, edges = np.histogram(self.areas, 7, (0, self.areas.max()))
+        self.assertEqual(histogram.counts.tolist(), expected.tolist())
+        self.assertTrue(np.allclose(histogram.edges, edges))
+        self.assertIsNone(histogram.errors)
+
+    def testRangeQueries(self):
+        expected = int(np.count_nonzero((self.areas >= 2) & (self.areas <= 5)))
+        self.assertEqual(count_in_range(self.coords, 2, 5).count, expected)
+        self.assertEqual(count_in_range(self.coords, 2, 5, progress=lambda done, total: None).count, expected)
+        found = list(triangles_in_range(self.coords, 2, 5, chunk_size=64))
+        self.assertEqual(len(found), expected)
+        self.assertEqual(len(set(triple for _, triple in found)), expected)
+        for area, triple in found:
+            self.assertEqual(triangle_area(self.coords, triple), area)
+
+    def testSamplingStaysWithinErrorBounds(self):
+        expected = np.count_nonzero((self.areas >= 2) & (self.areas <= 5))
+        estimate = count_in_range(self.coords, 2, 5, samples=20000, seed=1)
+        self.assertGreater(estimate.error, 0)
+        self.assertLessEqual(abs(estimate.count - expected), estimate.error)
+        histogram = area_histogram(self.coords, bins=4, samples=20000, seed=1)
+        exact = area_histogram(self.coords, bins=4)
+        self.assertTrue((np.abs(histogram.counts - exact.counts) <= histogram.errors).all())
+
+    def testParallelMatchesSerial(self):
+        self.assertEqual(
+            area_histogram(self.coords, bins=5, processes=2).counts.tolist(),
+            area_histogram(self.coords, bins=5).counts.tolist(),
+        )
+
+
+class SearchJobTestCase(unittest.TestCase):
+    def testRunsTargetAndReportsProgress(self):
+        coords = np.random.default_rng(9).random((60, 2))
+        job = SearchJob(min_max_triangle, coords, chunk_size=256).start()
+        self.assertTrue(job.wait(30))
+        self.assertEqual(job.result, min_max_triangle(coords))
+        self.assertEqual(job.progress, 1.0)
+        self.assertIsNone(job.error)
+
+    def testCancelStopsAtNextReport(self):
+        engine = IncrementalMinMax()
+        coords = np.random.default_rng(10).random((400, 2))
+        job = SearchJob(engine.sync, np.arange(400), coords)
+        job.cancel()
+        job.start()
+        self.assertTrue(job.wait(30))
+        self.assertTrue(job.cancelled)
+        self.assertIsNone(job.error)
+        self.assertEqual(len(engine), 0)
+
+    def testKeepsErrors(self):
+        job = SearchJob(min_max_triangle, [1, 2, 3]).start()
+        job.wait(30)
+        self.assertIsInstance(job.error, ValueError)
+
+
+class ParallelMinMaxTestCase(unittest.TestCase):
+    def testShardsCoverAllOuterIndices(self):
+        for n, shards in ((0, 2), (5, 8), (200, 16)):
+            bounds = shard_bounds(n, shards)
+            self.assertEqual(bounds[0][0], 0)
+            self.assertEqual(bounds[-1][1], n)
+            self.assertTrue(all(a[1] == b[0] for a, b in zip(bounds, bounds[1:])))
+
+    def testMatchesSerialScan(self):
+        coords = np.random.default_rng(4).random((120, 2)) * 100
+        self.assertEqual(parallel_min_max(coords, processes=2), brute_force_min_max(coords))
+
+    def testWorkersPushBackTheSweep(self):
+        coords = as_exact_coords(np.arange(2 * (2 * SWEEP_MIN_POINTS - 1)).reshape(-1, 2))
+        self.assertTrue(use_sweep(coords))
+        self.assertFalse(use_sweep(coords, processes=2))
+        self.assertFalse(use_sweep(coords.astype(np.float64) + 0.5))
+
+
+class IncrementalMinMaxTestCase(unittest.TestCase):
+    def assertMatchesScan(self, engine):
+        (min_area2, min_triple), (max_area2, max_triple) = brute_force_min_max(engine.store.coords)
+        if min_triple is None:
+            self.assertIsNone(engine.min_numbers)
+        else:
+            self.assertEqual(2 * engine.min_area, min_area2)
+            self.assertEqual(2 * engine.max_area, max_area2)
+            triangle = engine.triangle("min", engine.min_numbers)
+            self.assertAlmostEqual(triangle.area, engine.min_area)
+
+    def testRandomizedEdits(self):
+        rng = np.random.default_rng(5)
+        for _ in range(20):
+            engine = IncrementalMinMax()
+            coords = rng.integers(0, 8, size=(rng.integers(3, 30), 2))
+            engine.extend(np.arange(len(coords)), coords)
+            self.assertMatchesScan(engine)
+            for number in range(100, 130):
+                if len(engine) and rng.random() < 0.5:
+                    engine.remove(int(rng.choice(engine.store.numbers)))
+                else:
+                    engine.add(number, *rng.integers(0, 8, size=2).tolist())
+                self.assertMatchesScan(engine)
+
+    def testAddedPointsUseTheExactKernel(self):
+        # Near 2**29, float products round away differences that the int64
+        # kernel of rebuild sees, so both paths must use it.
+        rng = np.random.default_rng(12)
+        for _ in range(30):
+            coords = rng.integers(0, 2**29, size=(12, 2))
+            added = IncrementalMinMax()
+            for number, (x, y) in enumerate(coords.tolist()):
+                added.add(number, x, y)
+            rebuilt = IncrementalMinMax()
+            rebuilt.extend(np.arange(len(coords)), coords)
+            self.assertEqual(
+                (added.min_numbers, added.min_area, added.max_numbers, added.max_area),
+                (rebuilt.min_numbers, rebuilt.min_area, rebuilt.max_numbers, rebuilt.max_area),
+            )
+
+    def testSyncAppliesDifferences(self):
+        coords = np.random.default_rng(6).random((50, 2)) * 100
+        engine = IncrementalMinMax()
+        engine.sync(np.arange(50), coords)
+        coords[10] = (50.0, 50.0)
+        engine.sync(np.arange(1, 50), coords[1:])
+        self.assertEqual(sorted(engine.store.numbers.tolist()), list(range(1, 50)))
+        self.assertMatchesScan(engine)
+
+    def testSyncCoordsIgnoresRenumbering(self):
+        coords = np.random.default_rng(11).integers(0, 100, size=(60, 2))
+        engine = IncrementalMinMax()
+        engine.sync_coords(coords)
+        kept = engine.store.numbers.tolist()
+        shifted = np.concatenate((coords[:20], [(500, 7)], coords[20:]))
+        engine.sync_coords(shifted)
+        self.assertEqual(engine.store.numbers.tolist(), kept + [60])
+        self.assertMatchesScan(engine)
+        engine.sync_coords(shifted[::-1][5:])
+        self.assertEqual(len(engine), 56)
+        self.assertMatchesScan(engine)
+
+
+class PointTestCase(unittest.TestCase):
+    def testValueSemantics(self):
+        point = Point(1, 2, 3)
+        self.assertEqual(point, Point(1, 2.0, 3.0))
+        self.assertEqual(len({point, Point(1, 2, 3), Point(2, 2, 3)}), 2)
+        self.assertFalse(hasattr(point, "__dict__"))
+        with self.assertRaises(AttributeError):
+            point.x = 5
+
+    def testPoolSharesDuplicates(self):
+        pool = PointPool()
+        first = pool.intern(Point(1, 0.0, 2.0))
+        self.assertIs(pool.intern(Point(7, -0.0, 2)), first)
+        self.assertIsNot(pool.intern(Point(8, 1, 2)), first)
+        self.assertEqual(len(pool), 2)
+        self.assertIs(pool.get(0, 2), first)
+        self.assertIn((1, 2), pool)
+
+
+class PointStoreTestCase(unittest.TestCase):
+    def testAddGrowsAndIndexes(self):
+        store = PointStore(capacity=2)
+        for number in range(1, 101):
+            store.add(number, number * 2.0, -number)
+        self.assertEqual(len(store), 100)
+        self.assertIn(50, store)
+        self.assertEqual(store.row_of(50), 49)
+        point = store.get(50)
+        self.assertEqual((point.number, point.x, point.y), (50, 100.0, -50.0))
+        self.assertEqual(store.coords.shape, (100, 2))
+        self.assertIsNone(store.get(1000))
+
+    def testRejectsDuplicateNumbers(self):
+        store = PointStore()
+        store.add(1, 0, 0)
+        with self.assertRaises(ValueError):
+            store.add(1, 5, 5)
+        with self.assertRaises(ValueError):
+            store.extend([2, 1], [(1, 1), (2, 2)])
+        self.assertEqual(len(store), 1)
+
+    def testExtendAndClear(self):
+        store = PointStore(capacity=1)
+        store.extend(np.arange(10), np.arange(20).reshape(10, 2))
+        self.assertEqual([point.number for point in store], list(range(10)))
+        self.assertEqual(store.get(3).y, 7.0)
+        store.clear()
+        self.assertEqual(len(store), 0)
+        self.assertNotIn(3, store)
+
+    def testRemoveMovesLastRow(self):
+        store = PointStore()
+        store.extend([1, 2, 3], [(0, 0), (1, 1), (2, 2)])
+        self.assertEqual(store.remove(1), 0)
+        self.assertEqual(store.numbers.tolist(), [3, 2])
+        self.assertEqual(store.row_of(3), 0)
+        self.assertEqual(store.get(3).x, 2.0)
+        with self.assertRaises(ValueError):
+            store.remove(1)
+
 
-    def tearDown(self):
-        t = time.time() - self.startTime
-        print("%s: %.3f" % (self.id(), t))
+class PointsDrawTestCase(unittest.TestCase):
+    def testOnPointFindsNearestWithinRadius(self):
+        points = PointsDraw(Figure().add_subplot(), "k", scale=10)
+        for x, y in ((0, 0), (5, 5), (5.5, 5)):
+            points.add_point_with_coordinates(x, y)
+        self.assertEqual(points.on_point(5.4, 5).number, 3)
+        self.assertIsNone(points.on_point(2, 2))
+        self.assertIsInstance(points.add_point(Point(1, 9, 9)), ValueError)
 
-    def testListRemovingById(self):
-        _list = [Item(id) for id in reversed(range(10_000_000))]
-        _list = [triangle for triangle in _list if triangle.id != id]
+    def testSwitchesToDensityAboveThreshold(self):
+        axes = Figure().add_subplot()
+        points = PointsDraw(axes, "k")
+        points.LOD_THRESHOLD = 500
+        coords = np.random.default_rng(12).random((2000, 2)) * 100
+        points.add_points_with_coordinates(coords)
+        points.update_draw()
+        self.assertTrue(points.density.get_visible())
+        self.assertEqual(len(points.draw.get_offsets()), 0)
+        counts = np.expm1(points.density.get_array()).round()
+        self.assertEqual(counts.sum(), 2000)
 
-class RemoveListItemTestCaseRemovingFindedItemInList1(unittest.TestCase):
+        # Zooming in far enough brings back the true points in view.
+        axes.set_xlim(0, 20)
+        axes.set_ylim(0, 20)
+        inside = (coords[:, 0] <= 20) & (coords[:, 1] <= 20)
+        self.assertFalse(points.density.get_visible())
+        self.assertEqual(len(points.draw.get_offsets()), np.count_nonzero(inside))
+
+    def testBinDensityMatchesHistogram2d(self):
+        points = PointsDraw(Figure().add_subplot(), "k")
+        points.DENSITY_BINS = 7
+        coords = np.random.default_rng(13).random((500, 2)) * 10
+        expected, _, _ = np.histogram2d(coords[:, 0], coords[:, 1], bins=7, range=((0, 10), (0, 10)))
+        np.testing.assert_allclose(np.expm1(points.bin_density(coords, (0, 10, 0, 10))), expected.T)
+
+
+class GridIndexTestCase(unittest.TestCase):
+    def testNearestMatchesLinearScan(self):
+        rng = np.random.default_rng(5)
+        coords = rng.random((2000, 2)) * 50 - 25
+        index = GridIndex(0.6)
+        index.insert_many(np.arange(1000), coords[:1000])
+        index.insert_many(np.arange(1000, 2000), coords[1000:])
+        for x, y in rng.random((500, 2)) * 50 - 25:
+            distances = np.hypot(coords[:, 0] - x, coords[:, 1] - y)
+            expected = int(np.argmin(distances)) if distances.min() <= 0.6 else None
+            self.assertEqual(index.nearest(coords, x, y, 0.6), expected)
+
+
+class TriangleIndexTestCase(unittest.TestCase):
+    def testNearestMatchesLinearScan(self):
+        rng = np.random.default_rng(7)
+        vertices = rng.random((3000, 3, 2)) * 1000
+        vertices[:, 1:] = vertices[:, :1] + (vertices[:, 1:] - vertices[:, :1]) * 0.02
+        index = TriangleIndex(vertices)
+        for x, y in rng.random((100, 2)) * 1000:
+            distances = segment_distances(x, y, vertices, np.roll(vertices, -1, axis=1)).min(axis=1)
+            row, distance = index.nearest(x, y)
+            self.assertAlmostEqual(distance, distances.min())
+            self.assertAlmostEqual(distances[row], distances.min())
+
+    def testNearestAmongLargeOverlappingTriangles(self):
+        rng = np.random.default_rng(11)
+        vertices = rng.random((2000, 3, 2)) * 1000
+        vertices[0] = vertices[1]
+        index = TriangleIndex(vertices)
+        alive = np.ones(len(vertices), dtype=bool)
+        for row in rng.choice(len(vertices), 500, replace=False):
+            index.discard(row)
+            alive[row] = False
+        for x, y in rng.random((100, 2)) * 1000:
+            distances = segment_distances(x, y, vertices, np.roll(vertices, -1, axis=1)).min(axis=1)
+            distances[~alive] = np.inf
+            row, distance = index.nearest(x, y)
+            self.assertEqual(distance, distances.min())
+            self.assertEqual(distances[row], distance)
+        for row in np.flatnonzero(alive):
+            index.discard(row)
+        self.assertIsNone(index.nearest(500, 500))
+
+    def testSegmentDistances(self):
+        starts = np.array([(-1.0, 0.0), (-1.0, 0.0), (2.0, 2.0)])
+        ends = np.array([(1.0, 0.0), (1.0, 0.0), (2.0, 2.0)])
+        np.testing.assert_allclose(segment_distances(0, 1, starts, ends)[:2], [1, 1])
+        np.testing.assert_allclose(segment_distances(3, 0, starts, ends), [2, 2, np.sqrt(5)])
+
+    def testOnTriangle(self):
+        triangles = TrianglesDraw(Figure().add_subplot(), "k")
+        triangles.add_triangle(Triangle("a", Point(1, 0, 0), Point(2, 4, 0), Point(3, 0, 4)))
+        triangles.add_triangle(Triangle("b", Point(4, 10, 10), Point(5, 14, 10), Point(6, 10, 14)))
+        self.assertEqual(triangles.on_triangle(1, 1).id, "a")
+        self.assertEqual(triangles.on_triangle(13, 13).id, "b")
+
+
+class TrianglesDrawTestCase(unittest.TestCase):
     def setUp(self):
-        self.startTime = time.time()
+        figure = Figure()
+        self.canvas = FigureCanvasAgg(figure)
+        axes = figure.add_subplot()
+        axes.set_xlim(-1, 30)
+        axes.set_ylim(-1, 30)
+        self.triangles = TrianglesDraw(axes, "k")
+
+    def addTriangle(self, id, x):
+        self.triangles.add_triangle_with_points(id, Point(1, x, 0), Point(2, x + 3, 0), Point(3, x, 3))
+
+    def drawnOutlines(self):
+        # Closed outlines of five rows each: three vertices, the first
+        # vertex again and a NaN separator.
+        return self.triangles.edges.get_xydata().reshape(-1, 5, 2)[:, :4]
+
+    def testEveryAdditionRenders(self):
+        for x in range(20):
+            self.addTriangle(str(x), x)
+        self.assertEqual(len(self.drawnOutlines()), 20)
+        np.testing.assert_array_equal(self.drawnOutlines()[19], [(19, 0), (22, 0), (19, 3), (19, 0)])
+
+    def testRemoveKeepsRowsInOrder(self):
+        for x in range(3):
+            self.addTriangle(str(x), x)
+        self.triangles.remove_triangle_by_id("1")
+        self.assertEqual(self.triangles.ids, ["0", "2"])
+        self.assertEqual(self.drawnOutlines()[1, 0].tolist(), [2, 0])
+        self.triangles.clear()
+        self.assertEqual(len(self.drawnOutlines()), 0)
 
-    def tearDown(self):
-        t = time.time() - self.startTime
-        print("%s: %.3f" % (self.id(), t))
+    def testBatchedEditsRedrawOnce(self):
+        for x in range(5):
+            self.addTriangle(str(x), x)
+        with mock.patch.object(self.canvas, "draw_idle") as draw_idle:
+            with self.triangles.batch_edits():
+                for id in ["0", "2", "4"]:
+                    self.triangles.remove_triangle_by_id(id)
+                self.assertEqual(len(self.drawnOutlines()), 5)
+            draw_idle.assert_called_once_with()
+        self.assertEqual(sorted(self.triangles.ids), ["1", "3"])
+        self.assertEqual(len(self.drawnOutlines()), 2)
 
-    def testListRemovingById(self):
-        _list = [Item(id) for id in range(10_000_000)]
-        for triangle in _list:
-            if triangle.id == id:
-                _list.remove(triangle)
-                break
+    def testSwapRemoveKeepsSlotsConsistent(self):
+        rng = np.random.default_rng(14)
+        for x in range(50):
+            self.addTriangle(str(x), x)
+        for id in rng.permutation(50)[:30].tolist():
+            self.triangles.remove_triangle_by_id(str(id))
+        self.triangles.remove_triangle_by_id("missing")
+        self.assertEqual(len(self.triangles), 20)
+        for id, slot in self.triangles.slots.items():
+            self.assertEqual(self.triangles.ids[slot], id)
+            self.assertEqual(self.triangles.vertices[slot, 0].tolist(), [int(id), 0])
+        with self.assertRaises(ValueError):
+            self.addTriangle(next(iter(self.triangles.slots)), 0)
 
-class RemoveListItemTestCaseRemovingFindedItemInList2(unittest.TestCase):
+    def testIndexIsPatchedAcrossEdits(self):
+        # A canvas-less figure, so the many edits do not each render.
+        triangles = TrianglesDraw(Figure().add_subplot(), "k")
+        triangles.add_triangles(
+            Triangle(str(x), Point(1, x, 0), Point(2, x + 3, 0), Point(3, x, 3)) for x in range(300)
+        )
+        triangles.on_triangle(0, 0)
+        index = triangles.index
+        rng = np.random.default_rng(15)
+        for step in range(300):
+            if rng.random() < 0.6:
+                triangles.remove_triangle_by_id(rng.choice(triangles.ids))
+            else:
+                x = rng.random() * 300
+                triangles.add_triangle_with_points(f"new{step}", Point(1, x, 0), Point(2, x + 3, 0), Point(3, x, 3))
+            x, y = rng.random(2) * 300
+            vertices = triangles.vertices[: len(triangles)]
+            distances = segment_distances(x, y, vertices, np.roll(vertices, -1, axis=1)).min(axis=1)
+            found = triangles.on_triangle(x, y)
+            self.assertAlmostEqual(distances[triangles.slots[found.id]], distances.min())
+            if step < 20:
+                self.assertIs(triangles.index, index)
+        outlines = triangles.edges.get_xydata().reshape(-1, 5, 2)
+        np.testing.assert_array_equal(outlines[:, :3], triangles.vertices[: len(triangles)])
+        self.assertTrue(np.isnan(outlines[:, 4]).all())
+
+    def testPatternRemovalDropsMatches(self):
+        self.triangles.add_triangles(
+            Triangle(id, Point(1, x, 0), Point(2, x + 3, 0), Point(3, x, 3))
+            for x, id in enumerate(("min", "max", "min-2", "other", "xmin"))
+        )
+        self.triangles.remove_triangles_by_id_pattern("min")
+        self.assertEqual(self.triangles.ids, ["max", "other", "xmin"])
+        self.assertEqual(self.triangles.slots, {"max": 0, "other": 1, "xmin": 2})
+        self.assertEqual(self.drawnOutlines()[1, 0].tolist(), [3, 0])
+
+    def testOutlinesAreFigureContent(self):
+        self.addTriangle("a", 5)
+        self.assertFalse(self.triangles.edges.get_animated())
+        self.assertIs(blit_manager(self.canvas), self.triangles.blit)
+        self.assertIsNotNone(self.triangles.blit.background)
+        self.triangles.edges.set_color("#123456")
+        for format in ("pdf", "svg"):
+            output = io.BytesIO()
+            self.canvas.figure.savefig(output, format=format)
+            if format == "svg":
+                self.assertIn(b"#123456", output.getvalue())
+
+
+class HoverControllerTestCase(unittest.TestCase):
     def setUp(self):
-        self.startTime = time.time()
-
-    def tearDown(self):
-        t = time.time() - self.startTime
-        print("%s: %.3f" % (self.id(), t))
-
-    def testListRemovingById(self):
-        _list = [Item(id) for id in reversed(range(10_000_000))]
-        for triangle in _list:
-            if triangle.id == id:
-                _list.remove(triangle)
-                break
+        figure = Figure()
+        self.canvas = FigureCanvasAgg(figure)
+        self.axes = figure.add_subplot()
+        self.points = PointsDraw(self.axes, "k", scale=10)
+        self.triangles = TrianglesDraw(self.axes, "r")
+        self.points.add_point_with_coordinates(0, 0)
+        self.triangles.add_triangle_with_points("t", Point(1, 0, 0), Point(2, 10, 0), Point(3, 0, 10))
+        self.axes.set_xlim(-5, 15)
+        self.axes.set_ylim(-5, 15)
+        self.canvas.draw()
+        self.blits = 0
+        blit = self.canvas.blit
+
+        def counting_blit(bbox=None):
+            self.blits += 1
+            blit(bbox)
+
+        self.canvas.blit = counting_blit
+
+    def move(self, x, y):
+        px, py = self.axes.transData.transform((x, y))
+        event = MouseEvent("motion_notify_event", self.canvas, px, py)
+        self.canvas.callbacks.process("motion_notify_event", event)
+
+    def testRedrawsOnlyWhenTheHitChanges(self):
+        self.move(0.1, 0)
+        self.assertTrue(self.points.annotation.get_visible())
+        self.assertFalse(self.triangles.annotation.get_visible())
+        self.assertEqual(self.blits, 1)
+        self.move(0.15, 0)
+        self.assertEqual(self.blits, 1)
+
+        self.move(3, 3)
+        self.assertFalse(self.points.annotation.get_visible())
+        self.assertTrue(self.triangles.annotation.get_visible())
+        self.move(3.1, 3)
+        self.assertEqual(self.blits, 2)
+
+        # on_triangle reports the nearest triangle at any distance.
+        self.move(14, 14)
+        self.assertEqual(self.blits, 2)
+        self.move(0, 0)
+        self.assertTrue(self.points.annotation.get_visible())
+        self.assertEqual(self.blits, 3)
+
+    def testRemovingTheHoveredTriangleHidesItsAnnotation(self):
+        self.triangles.add_triangle_with_points("u", Point(4, 12, 12), Point(5, 14, 12), Point(6, 12, 14))
+        self.move(3, 3)
+        self.assertTrue(self.triangles.annotation.get_visible())
+        self.triangles.remove_triangle_by_id("u")
+        self.assertTrue(self.triangles.annotation.get_visible())
+        self.triangles.remove_triangle_by_id("t")
+        self.assertFalse(self.triangles.annotation.get_visible())
+        self.assertIsNone(self.triangles.hover.last)
+
+        self.triangles.add_triangle_with_points("v", Point(1, 0, 0), Point(2, 10, 0), Point(3, 0, 10))
+        self.move(3, 3)
+        self.triangles.remove_triangles_by_id_pattern("v")
+        self.assertFalse(self.triangles.annotation.get_visible())
+
+    def testManagerDiesWithItsFigure(self):
+        figures = []
+        for _ in range(5):
+            figure = Figure()
+            blit_manager(FigureCanvasAgg(figure))
+            figures.append(weakref.ref(figure))
+        del figure
+        gc.collect()
+        self.assertEqual([figure() for figure in figures], [None] * 5)
+
+    def testControllerDiesWithItsFigure(self):
+        figures = []
+        for _ in range(5):
+            figure = Figure()
+            FigureCanvasAgg(figure)
+            axes = figure.add_subplot()
+            PointsDraw(axes, "k", scale=10)
+            TrianglesDraw(axes, "r").add_triangle_with_points("t", Point(1, 0, 0), Point(2, 1, 0), Point(3, 0, 1))
+            figures.append(weakref.ref(figure))
+        del figure, axes
+        gc.collect()
+        self.assertEqual([figure() for figure in figures], [None] * 5)
+
+    def testSharedPerCanvas(self):
+        self.assertIs(self.points.hover, self.triangles.hover)
+        self.assertIs(hover_controller(self.canvas).blit, blit_manager(self.canvas))
+
+
+class PointFileTestCase(unittest.TestCase):
+    def testTokensSplitAcrossBuffers(self):
+        data = b"[0, 0][38, 9] junk [-1.5,+2e3]\n[ .5 , 7. ], [1 2, 3][4, 5][1,2"
+        expected = [[0, 0], [38, 9], [-1.5, 2000], [0.5, 7], [4, 5]]
+        for buffer_size in (1, 2, 3, 7, 16, 1024):
+            chunks = list(iter_point_chunks(io.BytesIO(data), buffer_size))
+            self.assertEqual(np.concatenate(chunks).tolist(), expected)
+
+    def testReadPoints(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "plist.txt")
+            with open(path, "w") as pointlist:
+                pointlist.write("[3, 4][-5, 6]")
+            self.assertEqual(read_points(path).tolist(), [[3, 4], [-5, 6]])
+            with open(path, "w") as pointlist:
+                pointlist.write("no points here")
+            self.assertEqual(read_points(path).shape, (0, 2))
+
+    def testDuplicatesDroppedAtLoad(self):
+        coords = [(1, 2), (0, 0), (1, 2), (-0.0, 0), (3, 1), (0, 0)]
+        self.assertEqual(unique_rows(coords).tolist(), [0, 1, 4])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "plist.txt")
+            with open(path, "w") as pointlist:
+                pointlist.write("".join("[%g, %g]" % point for point in coords))
+            self.assertEqual(read_points(path, unique=True).tolist(), [[1, 2], [0, 0], [3, 1]])
+            self.assertEqual(len(read_points(path)), 6)
+
+    def testStreamingFilterMatchesUniqueRows(self):
+        rng = np.random.default_rng(23)
+        coords = rng.integers(-50, 50, size=(20_000, 2)).astype(np.float64)
+        coords[rng.random(len(coords)) < 0.1] *= -0.0
+        seen = UniqueFilter(capacity=4)
+        kept = np.concatenate(
+            [np.flatnonzero(seen.keep(coords[start : start + 777])) + start for start in range(0, len(coords), 777)]
+        )
+        self.assertEqual(kept.tolist(), unique_rows(coords).tolist())
+        self.assertEqual(len(seen), len(kept))
+
+    def testBulkLoadNumbering(self):
+        points = PointsDraw(Figure().add_subplot(), "k")
+        points.add_point(Point(5, 0, 0))
+        points.add_points_with_coordinates([(1, 1), (2, 2)])
+        self.assertEqual(points.store.numbers.tolist(), [5, 6, 7])
+
+
+class BinaryPointFileTestCase(unittest.TestCase):
+    def testRoundTrip(self):
+        coords = np.random.default_rng(8).random((1000, 2))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "points.bin")
+            write_binary_points(path, coords, np.arange(1000) * 3)
+            self.assertTrue(is_binary_point_file(path))
+            columns = open_binary_points(path)
+            self.assertIsInstance(columns.x, np.memmap)
+            np.testing.assert_array_equal(columns.coords, coords)
+            np.testing.assert_array_equal(columns.numbers, np.arange(1000) * 3)
+            chunks = list(columns.iter_chunks(300))
+            self.assertEqual([len(numbers) for numbers, _ in chunks], [300, 300, 300, 100])
+            np.testing.assert_array_equal(np.concatenate([chunk for _, chunk in chunks]), coords)
+            del columns, chunks
+
+    def testConvertFromText(self):
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, "plist.txt")
+            binary_path = os.path.join(directory, "plist.bin")
+            with open(text_path, "w") as pointlist:
+                pointlist.write("".join(f"[{x}, {-x}]" for x in range(500)))
+            self.assertEqual(convert_text_to_binary(text_path, binary_path, buffer_size=64), 500)
+            self.assertFalse(is_binary_point_file(text_path))
+            columns = open_binary_points(binary_path)
+            np.testing.assert_array_equal(columns.coords, read_points(text_path))
+            np.testing.assert_array_equal(columns.numbers, np.arange(1, 501))
+            del columns
+
+    def testRejectsOtherFiles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "plist.txt")
+            with open(path, "wb") as pointlist:
+                pointlist.write(b"[1, 2]" * 20)
+            with self.assertRaises(ValueError):
+                open_binary_points(path)
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    def testRoundTripIgnoresPointOrder(self):
+        coords = np.random.default_rng(11).random((30, 2))
+        shuffled = coords[::-1].copy()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory)
+            key = cache.key(coords, "min_max")
+            self.assertEqual(key, cache.key(shuffled, "min_max"))
+            self.assertNotEqual(key, cache.key(coords, "top_k", k=3))
+            self.assertIsNone(cache.get(key))
+
+            cache.put(key, encode_min_max(coords, min_max_triangle(coords)))
+            cached = decode_min_max(shuffled, cache.get(key))
+            expected = min_max_triangle(shuffled)
+            self.assertEqual((cached.min_triple, cached.max_triple), (expected.min_triple, expected.max_triple))
+            self.assertAlmostEqual(cached.min_area, expected.min_area)
+
+    def testUnwritableDirectoryIsSkipped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            blocker = os.path.join(directory, "file")
+            open(blocker, "w").close()
+            cache = ResultCache(os.path.join(blocker, "cache"))
+            with contextlib.redirect_stderr(io.StringIO()) as errors:
+                self.assertFalse(cache.put("a", {"payload": 1}))
+            self.assertIn("cannot write the result cache", errors.getvalue())
+            self.assertIsNone(cache.get("a"))
+
+    def testEvictsLeastRecentlyUsed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Each entry is 115 bytes, so three fit and a fourth evicts one.
+            cache = ResultCache(directory, max_bytes=400)
+            for name, mtime in (("a", 1), ("b", 2), ("c", 3)):
+                cache.put(name, {"payload": "x" * 100})
+                os.utime(os.path.join(directory, name + ".json"), (mtime, mtime))
+            cache.get("a")
+            cache.put("d", {"payload": "x" * 100})
+            self.assertIsNone(cache.get("b"))
+            for name in "acd":
+                self.assertIsNotNone(cache.get(name))
+
+
+class CommandLineTestCase(unittest.TestCase):
+    def testWritesJsonResults(self):
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, "plist.txt")
+            binary_path = os.path.join(directory, "plist.bin")
+            output_path = os.path.join(directory, "result.json")
+            with open(text_path, "w") as pointlist:
+                pointlist.write("[0, 0][4, 0][0, 0][0, 3][1, 1]")
+            write_binary_points(binary_path, [(0, 0), (4, 0), (0, 3), (1, 1)], [10, 20, 30, 40])
+
+            cache_dir = os.path.join(directory, "cache")
+            arguments = [text_path, binary_path, "-o", output_path, "--top", "2", "--cache-dir", cache_dir]
+            arguments.append("--collinear-stats")
+            self.assertEqual(cli_main(arguments), 0)
+            self.assertEqual(cli_main(arguments), 0)
+            with open(output_path) as result_file:
+                text_result, binary_result = json.load(result_file)
+            self.assertTrue(text_result["cached"])
+            self.assertEqual(text_result["max"]["area"], 6.0)
+            self.assertEqual((text_result["points"], text_result["duplicates"]), (4, 1))
+            self.assertEqual((text_result["collinear_triples"], text_result["longest_line"]), (0, 2))
+            self.assertEqual(text_result["max"]["points"], [1, 2, 4])
+            self.assertEqual(binary_result["max"]["points"], [10, 20, 30])
+            self.assertEqual(binary_result["min"]["area"], 1.5)
+            self.assertEqual([entry["area"] for entry in text_result["largest"]], [6.0, 2.5])
+            self.assertEqual([entry["area"] for entry in text_result["smallest"]], [1.5, 2.0])
+
+    def testUnwritableCacheKeepsResults(self):
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, "plist.txt")
+            with open(text_path, "w") as pointlist:
+                pointlist.write("[0, 0][4, 0][0, 3][1, 1]")
+            open(os.path.join(directory, "file"), "w").close()
+            cache_dir = os.path.join(directory, "file", "cache")
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(cli_main([text_path, "--top", "1", "--cache-dir", cache_dir]), 0)
+            (result,) = json.loads(output.getvalue())
+            self.assertEqual(result["max"]["area"], 6.0)
+            self.assertFalse(result["cached"])
+
+    def testDoesNotImportMatplotlib(self):
+        code = "import sys; from pycoordsplain.cli import main; main(['--no-cache'] + sys.argv[1:]); print('matplotlib' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code, os.path.join(os.path.dirname(__file__), "..", "data", "plist.txt")],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        self.assertTrue(output.rstrip().endswith("False"))
+
+
+class ImportLayeringTestCase(unittest.TestCase):
+    def loadedModules(self, statement):
+        code = f"import sys; {statement}; print(' '.join(sorted(sys.modules)))"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        return set(output.split())
+
+    def testGeometryImportsNeitherNumpyNorMatplotlib(self):
+        loaded = self.loadedModules("from pycoordsplain.geometry import Point, doubled_signed_area")
+        self.assertNotIn("numpy", loaded)
+        self.assertNotIn("matplotlib", loaded)
+
+    def testCoreDefersDrawingLayer(self):
+        loaded = self.loadedModules("import pycoordsplain.triangles, pycoordsplain.points")
+        self.assertNotIn("matplotlib", loaded)
+        self.assertNotIn("pycoordsplain.drawing", loaded)
+        self.assertNotIn("pycoordsplain.search", loaded)
 
 
 if __name__ == "__main__":